@@ -5,18 +5,33 @@ Uses MediaPipe Hands for real-time hand landmark detection from base64 images.
 """
 
 import os
+import sys
 import io
 import base64
+import csv
+import hashlib
+import importlib.util
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, count
+from multiprocessing import shared_memory
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional, Tuple
 
 import cv2
 import numpy as np
 import mediapipe as mp
 from PIL import Image
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
@@ -24,6 +39,50 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 
+try:
+    # SIMD (AVX2/SSSE3) base64 codec; drop-in replacement for the stdlib module
+    import pybase64 as base64_codec
+except ImportError:
+    base64_codec = base64
+
+try:
+    # Direct libjpeg-turbo bindings for the JPEG fast path in decode_image_bytes
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJFLAG_FASTDCT
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # Package missing, or the libturbojpeg shared library could not be found
+    turbo_jpeg = None
+
+try:
+    # Gradient-boosted trees; much faster single-sample predict than a random forest
+    import lightgbm
+except ImportError:
+    lightgbm = None
+
+try:
+    # JIT compiler for the landmark normalization loop
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    # SIMD-vectorized hash for keying the duplicate-frame response cache
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    # Binary wire format for /detect-gesture-bin
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    # Rust JSON encoder with native NumPy support; several times faster than stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,76 +90,1064 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that parses and serializes with orjson, falling back to stdlib json."""
+    
+    option = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    
+    # Keep insertion order, as orjson does; sorting only costs time on the stdlib fallback
+    sort_keys = False
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        # Parses the raw body bytes directly; multi-MB base64 strings are copied in one go
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        # Hand the encoded bytes straight to the response, skipping a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
 
 # Configure Flask
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
+# Public API version, bumped when response formats change
+API_VERSION = '1.1.0'
+
+# Landmark layouts accepted by the format query parameter of /detect-gesture
+LANDMARK_FORMATS = ('aos', 'soa')
+
+# imdecode flag that decodes straight to RGB (OpenCV 4.11+), None on older builds
+IMREAD_COLOR_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+
+# Leading bytes of every JPEG stream (SOI marker + first segment marker)
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+# Fixed-point scale for /detect-gesture-bin: coordinates are sent as int16(round(v * scale))
+BINARY_COORD_SCALE = 10000
+
 # Data storage configuration
 CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), 'gesture_data.csv')
 MODEL_FILE_PATH = os.path.join(os.path.dirname(__file__), 'gesture_model.pkl')
 
+# MediaPipe hand landmark names, indexed by landmark id (0-20)
+LANDMARK_NAMES = (
+    'WRIST',
+    'THUMB_CMC', 'THUMB_MCP', 'THUMB_IP', 'THUMB_TIP',
+    'INDEX_FINGER_MCP', 'INDEX_FINGER_PIP', 'INDEX_FINGER_DIP', 'INDEX_FINGER_TIP',
+    'MIDDLE_FINGER_MCP', 'MIDDLE_FINGER_PIP', 'MIDDLE_FINGER_DIP', 'MIDDLE_FINGER_TIP',
+    'RING_FINGER_MCP', 'RING_FINGER_PIP', 'RING_FINGER_DIP', 'RING_FINGER_TIP',
+    'PINKY_MCP', 'PINKY_PIP', 'PINKY_DIP', 'PINKY_TIP'
+)
+
+# Landmark attribute readers for read_landmark_fields
+LANDMARK_XYZ = attrgetter('x', 'y', 'z')
+LANDMARK_XYZV = attrgetter('x', 'y', 'z', 'visibility')
+
 # Initialize MediaPipe Hands
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-# Global MediaPipe Hands model
+# Pool of static-image MediaPipe Hands models for this process. Graphs are not thread-safe,
+# so each batcher thread checks one out; hands_model is the first one (for status checks)
 hands_model = None
+hands_pool: 'queue.Queue' = queue.Queue()
+MEDIAPIPE_POOL_SIZE = max(1, int(os.environ.get('MEDIAPIPE_POOL_SIZE', 1)))
+
+# Run hand detection on MediaPipe's GPU delegate (falls back to CPU if unavailable). The
+# legacy mp.solutions graph is CPU-only in the pip wheels, so this implies the Tasks API
+MEDIAPIPE_USE_GPU = os.environ.get('MEDIAPIPE_USE_GPU', '0').lower() in ('1', 'true', 'yes')
+
+# Optional MediaPipe Tasks HandLandmarker bundle (hand_landmarker.task). When set, models are
+# built with the Tasks API instead of mp.solutions.hands
+HAND_LANDMARKER_MODEL_PATH = os.environ.get('HAND_LANDMARKER_MODEL_PATH') or (
+    os.path.join(os.path.dirname(__file__), 'hand_landmarker.task') if MEDIAPIPE_USE_GPU else None
+)
+if HAND_LANDMARKER_MODEL_PATH and not os.path.isfile(HAND_LANDMARKER_MODEL_PATH):
+    # The bundle is not shipped with the repo; without it neither delegate can be created
+    logger.warning(f"HandLandmarker bundle {HAND_LANDMARKER_MODEL_PATH} not found; "
+                   "using the CPU mp.solutions.hands graph")
+    HAND_LANDMARKER_MODEL_PATH = None
+
+# Dynamic batching in front of the shared model
+MEDIAPIPE_BATCH_SIZE = int(os.environ.get('MEDIAPIPE_BATCH_SIZE', 8))
+MEDIAPIPE_BATCH_MAX_WAIT_MS = float(os.environ.get('MEDIAPIPE_BATCH_MAX_WAIT_MS', 0))
+
+# Tracking-mode models for streaming clients: session_id -> [model, lock, last_used]
+# MediaPipe graphs are not thread-safe, so each session carries its own lock
+session_models: 'OrderedDict[str, list]' = OrderedDict()
+session_models_lock = threading.Lock()
+SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 30))  # seconds
+MAX_SESSIONS = max(1, int(os.environ.get('MAX_SESSIONS', 32)))
+
+# (epoch second, formatted timestamp) for now_iso()
+_timestamp_cache = (0, '')
+
+# Per-thread scratch buffers for decoded frames, reused across requests so the
+# hot path does not malloc/free a multi-MB pixel buffer for every image
+_scratch_buffers = threading.local()
+MAX_SCRATCH_BYTES = 3840 * 2160 * 3  # Larger frames get a one-off allocation
+
+# MediaPipe runs palm detection at 192px and landmarks at 224px, so larger frames
+# are downscaled to this longest side before inference
+MAX_INFERENCE_DIMENSION = int(os.environ.get('MAX_INFERENCE_DIMENSION', 640))
+
+# Responses for recently seen images (client retries, debounced duplicate frames),
+# keyed by a hash of the image bytes: digest -> (expires_at, response_data)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds
+RESPONSE_CACHE_MAX_IMAGE_BYTES = 2 * 1024 * 1024  # Larger images are never cached
+response_cache: 'OrderedDict[bytes, tuple]' = OrderedDict()
+response_cache_lock = threading.Lock()
+
+# Dataset columns: gesture_name, then x0, y0, z0, ..., x20, y20, z20
+CSV_HEADERS = ('gesture_name',) + tuple(f'{axis}{i}' for i in range(21) for axis in 'xyz')
+
+# Append handle for the dataset, kept open across /record-gesture calls
+_csv_appender = {'path': None, 'file': None, 'writer': None}
+_csv_appender_lock = threading.Lock()
+
+# Per-gesture sample counts of the dataset, updated on every save. 'size' is the file size the
+# counts correspond to; a mismatch means another process appended, so the file is rescanned
+_dataset_stats = {'path': None, 'size': None, 'counts': Counter()}
+_dataset_stats_lock = threading.Lock()
+
+# Train on wrist-relative, hand-size-scaled landmarks. Models remember the setting they were
+# trained with (landmarks_normalized_), so /detect always matches the loaded model
+NORMALIZE_LANDMARKS = os.environ.get('NORMALIZE_LANDMARKS', '0').lower() in ('1', 'true', 'yes')
+
+# Classifier trained by /train: 'random_forest' (default) or 'lightgbm'. /detect works with
+# whichever one the saved model is, so switching only affects the next training run
+GESTURE_CLASSIFIER = os.environ.get('GESTURE_CLASSIFIER', 'random_forest').lower()
+
+# How /detect runs the trained classifier: 'sklearn' (default) or 'onnx', which converts the
+# loaded model to an ONNX Runtime session with a fixed (N, 63) float32 input
+CLASSIFIER_RUNTIME = os.environ.get('CLASSIFIER_RUNTIME', 'sklearn').lower()
+
+# Largest held-out accuracy loss /train accepts from the ONNX model before keeping sklearn
+MAX_ONNX_ACCURACY_DROP = float(os.environ.get('MAX_ONNX_ACCURACY_DROP', 0.005))
+
+# Dynamic batching of concurrent /detect predictions into one predict_proba call
+CLASSIFIER_BATCH_SIZE = int(os.environ.get('CLASSIFIER_BATCH_SIZE', 16))
+CLASSIFIER_BATCH_MAX_WAIT_MS = float(os.environ.get('CLASSIFIER_BATCH_MAX_WAIT_MS', 0))
+
+# Opt-in: run MediaPipe in a separate inference process per server process, fed frames
+# through shared memory; the classifier stays in the web process
+INFERENCE_PROCESS = os.environ.get('INFERENCE_PROCESS', 'False').lower() == 'true'
+INFERENCE_PROCESS_TIMEOUT = float(os.environ.get('INFERENCE_PROCESS_TIMEOUT', 30))  # seconds
+inference_process = None
+
+# Upper bound on frames in one /detect "images" request, to bound decoded-frame memory
+MAX_DETECT_BATCH_IMAGES = int(os.environ.get('MAX_DETECT_BATCH_IMAGES', 32))
+
+# Threads decoding the frames of a multi-image request in parallel (base64, JPEG and
+# resize all release the GIL); threads are only started on first use, after any fork
+DECODE_POOL_SIZE = int(os.environ.get('DECODE_POOL_SIZE', os.cpu_count() or 1))
+decode_pool = ThreadPoolExecutor(max_workers=max(1, DECODE_POOL_SIZE), thread_name_prefix='decode')
+
+# Trained classifier kept in memory between /detect calls; reloaded when the file changes,
+# so a model trained by another worker process is picked up too (see model_file_signature)
+_model_cache = {'signature': None, 'model': None}
+_model_cache_lock = threading.Lock()
+
+class MicroBatcher:
+    """
+    Collect work items from request threads and process them in batches on a worker thread.
+    
+    A batch is closed when it reaches max_batch_size or max_wait_ms after its first item
+    arrived; items already queued are always picked up without waiting.
+    """
+    
+    def __init__(self, process_batch, max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 name: str = 'batcher', num_workers: int = 1):
+        """
+        Args:
+            process_batch: Callable taking a list of items and returning a list of results
+                in the same order; an Exception in the results is raised to that caller only
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: How long to hold a batch open for more items
+            name: Worker thread name prefix
+            num_workers: Worker threads pulling batches from the shared queue
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._threads = [None] * max(1, num_workers)
+        self._thread_lock = threading.Lock()
+    
+    def submit(self, item: Any) -> Any:
+        """Queue an item and block until its result is available."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+    
+    def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items at once, so they can share batches, and block until all are done."""
+        self._ensure_worker()
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+    
+    def _ensure_worker(self):
+        # Started lazily so every gunicorn worker process gets its own threads after fork
+        if all(thread is not None and thread.is_alive() for thread in self._threads):
+            return
+        with self._thread_lock:
+            for index, thread in enumerate(self._threads):
+                if thread is None or not thread.is_alive():
+                    thread = threading.Thread(target=self._run, name=f'{self.name}-{index}', daemon=True)
+                    thread.start()
+                    self._threads[index] = thread
+    
+    def _next_batch(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+class TasksHandsModel:
+    """
+    MediaPipe Tasks HandLandmarker behind the legacy mp.solutions.hands interface.
+    
+    With use_gpu, tries the GPU delegate first and falls back to CPU. process() returns an object with
+    multi_hand_landmarks / multi_handedness shaped like the legacy results, so the rest
+    of the app does not care which backend produced it.
+    """
+    
+    def __init__(self, model_asset_path: str, static_image_mode: bool = True, use_gpu: bool = False):
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+        
+        self.static_image_mode = static_image_mode
+        self._last_timestamp_ms = -1
+        running_mode = vision.RunningMode.IMAGE if static_image_mode else vision.RunningMode.VIDEO
+        
+        self.landmarker = None
+        delegates = (BaseOptions.Delegate.GPU, BaseOptions.Delegate.CPU) if use_gpu else (BaseOptions.Delegate.CPU,)
+        for delegate in delegates:
+            options = vision.HandLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path=model_asset_path, delegate=delegate),
+                running_mode=running_mode,
+                num_hands=2,
+                min_hand_detection_confidence=0.7,
+                min_hand_presence_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+            try:
+                self.landmarker = vision.HandLandmarker.create_from_options(options)
+                self.delegate = delegate.name
+                break
+            except Exception as e:
+                logger.warning(f"HandLandmarker {delegate.name} delegate unavailable: {e}")
+        
+        if self.landmarker is None:
+            raise RuntimeError(f"Could not create HandLandmarker from {model_asset_path}")
+    
+    def process(self, rgb_image: np.ndarray):
+        """
+        Detect hands in an RGB image.
+        
+        Args:
+            rgb_image: RGB image array
+            
+        Returns:
+            Results object with legacy multi_hand_landmarks and multi_handedness fields
+        """
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_image))
+        if self.static_image_mode:
+            result = self.landmarker.detect(mp_image)
+        else:
+            # VIDEO mode needs strictly increasing timestamps
+            timestamp_ms = max(time.monotonic_ns() // 1_000_000, self._last_timestamp_ms + 1)
+            self._last_timestamp_ms = timestamp_ms
+            result = self.landmarker.detect_for_video(mp_image, timestamp_ms)
+        
+        if not result.hand_landmarks:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        
+        return SimpleNamespace(
+            multi_hand_landmarks=[
+                SimpleNamespace(landmark=[
+                    SimpleNamespace(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+                    for lm in hand
+                ])
+                for hand in result.hand_landmarks
+            ],
+            multi_handedness=[
+                SimpleNamespace(classification=[
+                    SimpleNamespace(label=category.category_name, score=category.score)
+                    for category in categories
+                ])
+                for categories in result.handedness
+            ]
+        )
+    
+    def close(self):
+        self.landmarker.close()
+
+def create_hands_model(static_image_mode: bool = True):
+    """
+    Create a MediaPipe Hands model with the server's detection settings.
+    
+    Args:
+        static_image_mode: True runs palm detection on every image; False tracks
+            landmarks across consecutive frames and only re-detects on tracking loss
+        
+    Returns:
+        MediaPipe Hands instance (or TasksHandsModel when HAND_LANDMARKER_MODEL_PATH is set)
+    """
+    if HAND_LANDMARKER_MODEL_PATH:
+        return TasksHandsModel(HAND_LANDMARKER_MODEL_PATH, static_image_mode=static_image_mode,
+                               use_gpu=MEDIAPIPE_USE_GPU)
+    
+    return mp_hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
 
 def initialize_mediapipe_model():
-    """Initialize the MediaPipe Hands model with optimal settings."""
+    """Initialize the pool of MediaPipe Hands models with optimal settings."""
     global hands_model
     try:
-        logger.info("Initializing MediaPipe Hands model...")
-        hands_model = mp_hands.Hands(
-            static_image_mode=True,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        logger.info("✅ MediaPipe Hands model initialized successfully!")
+        logger.info(f"Initializing {MEDIAPIPE_POOL_SIZE} MediaPipe Hands model(s)...")
+        models = [create_hands_model(static_image_mode=True) for _ in range(MEDIAPIPE_POOL_SIZE)]
+        
+        # Run one blank frame through each graph so the first request skips the lazy
+        # TFLite interpreter/delegate setup
+        warmup_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        warmup_frame.flags.writeable = False
+        for model in models:
+            model.process(warmup_frame)
+        for model in models:
+            hands_pool.put(model)
+        hands_model = models[0]
+        if isinstance(hands_model, TasksHandsModel):
+            logger.info(f"MediaPipe HandLandmarker initialized on {hands_model.delegate}")
+        else:
+            logger.info("MediaPipe Hands model initialized successfully")
         return True
     except Exception as e:
         logger.error(f"❌ Failed to initialize MediaPipe Hands model: {e}")
         return False
 
-def decode_base64_image(base64_string: str) -> Optional[np.ndarray]:
+def evict_idle_sessions():
+    """Close session models that have been idle too long or exceed MAX_SESSIONS."""
+    now = time.monotonic()
+    evicted = []
+    with session_models_lock:
+        # Ordered least recently used first, so stop at the first fresh session
+        for session_id, (model, lock, last_used) in list(session_models.items()):
+            if len(session_models) <= MAX_SESSIONS and now - last_used < SESSION_IDLE_TIMEOUT:
+                break
+            # Never close a graph that is mid-inference; it will be retried next time
+            if lock.acquire(blocking=False):
+                del session_models[session_id]
+                evicted.append((model, lock))
+    
+    for model, lock in evicted:
+        try:
+            model.close()
+        finally:
+            lock.release()
+    
+    if evicted:
+        logger.info(f"Evicted {len(evicted)} idle tracking session(s)")
+
+def get_session_model(session_id: str):
+    """
+    Get (or create) the tracking-mode Hands model for a streaming session.
+    
+    Args:
+        session_id: Client-chosen identifier for a stream of consecutive frames
+        
+    Returns:
+        Tuple of (model, lock); hold the lock while calling model.process
+    """
+    evict_idle_sessions()
+    
+    now = time.monotonic()
+    with session_models_lock:
+        entry = session_models.get(session_id)
+        if entry is not None:
+            entry[2] = now
+            session_models.move_to_end(session_id)
+    
+    if entry is None:
+        # Graph construction is slow, so build it outside the registry lock
+        model = create_hands_model(static_image_mode=False)
+        with session_models_lock:
+            entry = session_models.setdefault(session_id, [model, threading.Lock(), now])
+        if entry[0] is not model:
+            model.close()
+        logger.info(f"Started tracking session '{session_id}'")
+    
+    return entry[0], entry[1]
+
+def process_hands_batch(rgb_images: List[np.ndarray]) -> List[Any]:
+    """
+    Run a pooled static-image model over a batch of RGB images, one after another.
+    
+    Args:
+        rgb_images: RGB image arrays queued by request threads
+        
+    Returns:
+        MediaPipe results (or the raised exception) for each image, in order
+    """
+    # One model per batcher thread, so this never waits while the pool is fully built
+    model = hands_pool.get()
+    try:
+        batch_results = []
+        for rgb_image in rgb_images:
+            try:
+                batch_results.append(model.process(rgb_image))
+            except Exception as e:
+                batch_results.append(e)
+        return batch_results
+    finally:
+        hands_pool.put(model)
+
+hands_batcher = MicroBatcher(
+    process_hands_batch,
+    max_batch_size=MEDIAPIPE_BATCH_SIZE,
+    max_wait_ms=MEDIAPIPE_BATCH_MAX_WAIT_MS,
+    name='mediapipe-batcher',
+    num_workers=MEDIAPIPE_POOL_SIZE
+)
+
+def pack_hand_results(results) -> Optional[tuple]:
+    """Reduce a MediaPipe results object to picklable arrays for the trip between processes."""
+    if not results.multi_hand_landmarks:
+        return None
+    handedness = [(hand.classification[0].label, hand.classification[0].score)
+                  for hand in results.multi_handedness]
+    return extract_landmark_array(results), handedness
+
+def unpack_hand_results(packed: Optional[tuple]):
+    """Rebuild a legacy-shaped results object from pack_hand_results() output."""
+    if packed is None:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    
+    landmarks, handedness = packed
+    return SimpleNamespace(
+        multi_hand_landmarks=[
+            SimpleNamespace(landmark=[
+                SimpleNamespace(x=x, y=y, z=z, visibility=visibility)
+                for x, y, z, visibility in hand.tolist()
+            ])
+            for hand in landmarks
+        ],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label=label, score=score)])
+            for label, score in handedness
+        ]
+    )
+
+def serve_inference_request(responses, request_id: int, block_name: str, shape: tuple,
+                            session_id: Optional[str]):
+    """Detect hands in one shared-memory frame inside the inference process and post the result."""
+    block = frame = None
+    try:
+        block = shared_memory.SharedMemory(name=block_name)
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        frame.flags.writeable = False
+        result = pack_hand_results(detect_hands(frame, session_id))
+    except Exception as e:
+        # Only the message crosses the process boundary; arbitrary exceptions may not pickle
+        result = RuntimeError(f"Inference process error: {e}")
+    finally:
+        # The frame must be released before its shared-memory view can be closed
+        frame = None
+        if block is not None:
+            block.close()
+    responses.put((request_id, result))
+
+def watch_parent(lifeline):
+    """
+    Exit the inference process once the web process is gone.
+    
+    Only the web process holds the write end of the lifeline pipe, so recv() hits EOF when
+    it exits for any reason, SIGKILL included (e.g. gunicorn killing a timed-out worker).
+    """
+    try:
+        lifeline.recv()
+    except (EOFError, OSError):
+        pass
+    os._exit(0)
+
+def run_inference_process(requests, responses, lifeline):
+    """
+    Entry point of the inference process: own the MediaPipe models and serve frames
+    from the web process until it exits.
+    
+    Args:
+        requests: Queue of (request_id, shared memory name, frame shape, session_id)
+        responses: Queue of (request_id, packed results or exception); request_id None
+            carries the initialization status: the child's (backend, delegate), or None
+        lifeline: Read end of a pipe only the web process writes to (see watch_parent)
+    """
+    threading.Thread(target=watch_parent, args=(lifeline,), name='parent-watch', daemon=True).start()
+    
+    ready = initialize_mediapipe_model()
+    responses.put((None, hands_backend(hands_model) if ready else None))
+    if not ready:
+        return
+    
+    # Enough threads to keep every pooled model's batcher full
+    executor = ThreadPoolExecutor(max_workers=max(4, MEDIAPIPE_POOL_SIZE * MEDIAPIPE_BATCH_SIZE),
+                                  thread_name_prefix='inference')
+    while True:
+        executor.submit(serve_inference_request, responses, *requests.get())
+
+class InferenceProcess:
+    """
+    MediaPipe hand detection in a dedicated child process.
+    
+    Frames are copied into multiprocessing.shared_memory blocks instead of being pickled;
+    only the small packed results travel back, where a reader thread hands them to the
+    waiting request threads. A monitor thread fails the pending requests as soon as the
+    child exits and starts a new one; the child in turn exits when this process dies.
+    """
+    
+    def __init__(self):
+        # Spawn rather than fork, so the child never inherits live threads or graphs
+        self._context = multiprocessing.get_context('spawn')
+        self._lifeline_reader, self._lifeline = self._context.Pipe(duplex=False)
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._request_ids = count()
+        # 'starting', 'running' or 'stopped'; only 'running' accepts frames
+        self.state = 'starting'
+        self.restarts = 0
+        # Reported by the child once its models are built (see hands_backend)
+        self.backend: Optional[str] = None
+        self.delegate: Optional[str] = None
+        self._start_child()
+        threading.Thread(target=self._monitor, name='inference-monitor', daemon=True).start()
+    
+    def _start_child(self):
+        """Start a child on fresh queues; one that died mid-get may have left the old ones locked."""
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self._ready = Future()
+        self.process = self._context.Process(
+            target=run_inference_process, name='inference', daemon=True,
+            args=(self._requests, self._responses, self._lifeline_reader)
+        )
+        self.process.start()
+        threading.Thread(target=self._read_responses, name='inference-reader', daemon=True,
+                         args=(self.process, self._responses, self._ready)).start()
+    
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until the child has built its MediaPipe models; False if that failed."""
+        try:
+            return self._ready.result(timeout=timeout) is not None
+        except Exception:
+            return False
+    
+    def submit(self, rgb_image: np.ndarray, session_id: Optional[str] = None):
+        """Detect hands in one RGB frame; returns a legacy-shaped results object."""
+        return self.submit_many([rgb_image], session_id)[0]
+    
+    def submit_many(self, rgb_images: List[np.ndarray], session_id: Optional[str] = None) -> List[Any]:
+        """Detect hands in several RGB frames, sent together unless they share a session."""
+        if session_id and len(rgb_images) > 1:
+            # Tracking needs the frames in order, so wait for each before sending the next
+            return [self.submit(rgb_image, session_id) for rgb_image in rgb_images]
+        
+        blocks, futures = [], []
+        try:
+            for rgb_image in rgb_images:
+                block = shared_memory.SharedMemory(create=True, size=max(1, rgb_image.nbytes))
+                blocks.append(block)
+                np.ndarray(rgb_image.shape, dtype=np.uint8, buffer=block.buf)[...] = rgb_image
+                
+                request_id = next(self._request_ids)
+                future = Future()
+                # Checked under the lock the monitor takes when the child exits, so a frame is
+                # either refused here or failed by the monitor, never left waiting for the timeout
+                with self._pending_lock:
+                    if self.state != 'running' or not self.process.is_alive():
+                        raise RuntimeError(f"MediaPipe inference process is {self.state}")
+                    self._pending[request_id] = future
+                    self._requests.put((request_id, block.name, rgb_image.shape, session_id))
+                futures.append((request_id, future))
+            
+            return [unpack_hand_results(future.result(timeout=INFERENCE_PROCESS_TIMEOUT))
+                    for _, future in futures]
+        finally:
+            with self._pending_lock:
+                for request_id, _ in futures:
+                    self._pending.pop(request_id, None)
+            for block in blocks:
+                block.close()
+                block.unlink()
+    
+    def _read_responses(self, process, responses, ready: Future):
+        while True:
+            try:
+                request_id, result = responses.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    return  # The monitor has failed whatever was still pending
+                continue
+            
+            if request_id is None:
+                with self._pending_lock:
+                    if result is not None:
+                        self.backend, self.delegate = result
+                        self.state = 'running'
+                if not ready.done():
+                    ready.set_result(result)
+                continue
+            
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+            if future is None:
+                continue  # The request already timed out
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def _monitor(self):
+        """Fail pending requests as soon as the child exits, then restart it."""
+        while True:
+            process, requests, ready = self.process, self._requests, self._ready
+            # Wait on the sentinel rather than join(), so this never races is_alive() to reap
+            multiprocessing.connection.wait([process.sentinel])
+            process.join(timeout=1)
+            
+            with self._pending_lock:
+                was_running = self.state == 'running'
+                self.state = 'stopped'
+                pending, self._pending = self._pending, {}
+            error = RuntimeError(f"MediaPipe inference process exited with code {process.exitcode}")
+            for future in pending.values():
+                future.set_exception(error)
+            if not ready.done():
+                ready.set_result(None)
+            # Nothing reads the old requests pipe any more; do not block interpreter exit on it
+            requests.cancel_join_thread()
+            
+            if not was_running:
+                # A child that cannot even build its models would fail the same way again
+                logger.error(f"MediaPipe inference process exited during startup (code {process.exitcode})")
+                return
+            logger.error(f"MediaPipe inference process exited with code {process.exitcode}; restarting")
+            with self._pending_lock:
+                self.state = 'starting'
+                self.restarts += 1
+            self._start_child()
+
+def hands_backend(model) -> Tuple[str, str]:
+    """
+    Describe the hand detector serving requests.
+    
+    Args:
+        model: hands_model; a TasksHandsModel, legacy Hands graph, or InferenceProcess
+        
+    Returns:
+        Tuple of (backend, delegate), e.g. ('tasks', 'GPU') or ('solutions', 'CPU');
+        an InferenceProcess reports the models built in its child
+    """
+    if isinstance(model, InferenceProcess):
+        return model.backend, model.delegate
+    if isinstance(model, TasksHandsModel):
+        return 'tasks', model.delegate
+    return 'solutions', 'CPU'
+
+def detect_hands(rgb_image: np.ndarray, session_id: Optional[str] = None):
+    """
+    Run MediaPipe hand detection on an RGB image.
+    
+    Args:
+        rgb_image: RGB image array
+        session_id: Optional streaming session; its tracking model is used instead
+            of the shared static-image model so palm detection can be skipped
+        
+    Returns:
+        MediaPipe Hands results object
+    """
+    if inference_process is not None:
+        return inference_process.submit(rgb_image, session_id)
+    
+    if not session_id:
+        return hands_batcher.submit(rgb_image)
+    
+    session_model, session_lock = get_session_model(session_id)
+    with session_lock:
+        return session_model.process(rgb_image)
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with second resolution.
+    The string is formatted at most once per second and shared by all responses.
+    """
+    global _timestamp_cache
+    seconds = time.time_ns() // 1_000_000_000
+    cached_seconds, cached_timestamp = _timestamp_cache
+    if cached_seconds == seconds:
+        return cached_timestamp
+    
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(seconds))
+    # Swap the whole tuple so other threads never see a half-updated pair
+    _timestamp_cache = (seconds, timestamp)
+    return timestamp
+
+def get_scratch_image(height: int, width: int, slot: str = 'decode') -> np.ndarray:
+    """
+    Get a contiguous (height, width, 3) uint8 view into a per-thread scratch buffer.
+    
+    Args:
+        height: Image height in pixels
+        width: Image width in pixels
+        slot: Buffer name, so independent stages of a request don't overwrite each other
+        
+    Returns:
+        Writable image array, valid until the same slot is requested again on this thread
+    """
+    size = height * width * 3
+    if size > MAX_SCRATCH_BYTES:
+        return np.empty((height, width, 3), dtype=np.uint8)
+    
+    buffers = getattr(_scratch_buffers, 'buffers', None)
+    if buffers is None:
+        buffers = _scratch_buffers.buffers = {}
+    
+    buffer = buffers.get(slot)
+    if buffer is None or buffer.size < size:
+        buffer = buffers[slot] = np.empty(size, dtype=np.uint8)
+    
+    return buffer[:size].reshape(height, width, 3)
+
+def decode_base64_payload(base64_string: str) -> Optional[bytes]:
     """
-    Decode base64 image string to OpenCV image format.
+    Decode a base64 image string to raw image bytes.
     
     Args:
         base64_string: Base64 encoded image string (with or without data URL prefix)
         
     Returns:
-        OpenCV image array or None if decoding fails
+        Encoded image bytes (JPEG, PNG, ...) or None if decoding fails
     """
     try:
-        # Remove data URL prefix if present
-        if base64_string.startswith('data:image/'):
-            base64_string = base64_string.split(',')[1]
+        # Remove data URL prefix if present (base64 payloads never contain ',')
+        _, separator, payload = base64_string.partition(',')
+        if not separator:
+            payload = base64_string
         
         # Decode base64 to bytes
-        image_bytes = base64.b64decode(base64_string)
+        return base64_codec.b64decode(payload, validate=False)
+    except Exception as e:
+        logger.error(f"Failed to decode base64 payload: {e}")
+        return None
+
+def decode_image_bytes(image_bytes: bytes, color_space: str = 'rgb') -> Optional[np.ndarray]:
+    """
+    Decode encoded image bytes to an image array.
+    
+    Args:
+        image_bytes: Encoded image (JPEG, PNG, WebP, ...)
+        color_space: Channel order of the returned array, 'bgr' (OpenCV) or 'rgb' (MediaPipe)
         
-        # Convert bytes to PIL Image
+    Returns:
+        Image array or None if decoding fails. RGB arrays may live in this
+        thread's scratch buffer and are only valid until the next decode.
+    """
+    try:
+        # Canvas toDataURL frames are almost always JPEG: hand those straight to libjpeg-turbo
+        # in the requested channel order, skipping container sniffing and the channel swap
+        if turbo_jpeg is not None and image_bytes[:3] == JPEG_MAGIC:
+            try:
+                return turbo_jpeg.decode(
+                    image_bytes,
+                    pixel_format=TJPF_RGB if color_space == 'rgb' else TJPF_BGR,
+                    flags=TJFLAG_FASTDCT
+                )
+            except Exception as e:
+                logger.debug("turbojpeg decode failed, falling back to OpenCV: %s", e)
+        
+        encoded = np.frombuffer(image_bytes, dtype=np.uint8)
+        
+        # OpenCV >= 4.11 can have the codec emit RGB directly, skipping the channel swap pass
+        if color_space == 'rgb' and IMREAD_COLOR_RGB is not None:
+            rgb_image = cv2.imdecode(encoded, IMREAD_COLOR_RGB)
+            if rgb_image is not None:
+                return rgb_image
+        
+        # Decode straight to BGR with OpenCV (libjpeg-turbo/libpng, no extra copies)
+        opencv_image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+        if opencv_image is not None:
+            if color_space == 'rgb':
+                # Swap channels into the reusable scratch buffer instead of a fresh frame
+                height, width = opencv_image.shape[:2]
+                return cv2.cvtColor(opencv_image, cv2.COLOR_BGR2RGB,
+                                    dst=get_scratch_image(height, width))
+            return opencv_image
+        
+        # Fall back to PIL for formats OpenCV was built without (e.g. some WebP builds)
         pil_image = Image.open(io.BytesIO(image_bytes))
+        if pil_image.mode != 'RGB':
+            # convert() always copies, even to the mode the image already has
+            pil_image = pil_image.convert('RGB')
+        if color_space == 'rgb':
+            # PIL already yields RGB, no conversion needed
+            return np.asarray(pil_image)
         
         # Convert PIL to OpenCV format (RGB to BGR)
-        opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        opencv_image = cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
         
         return opencv_image
     except Exception as e:
-        logger.error(f"Failed to decode base64 image: {e}")
+        logger.error(f"Failed to decode image: {e}")
+        return None
+
+def decode_base64_image(base64_string: str, color_space: str = 'rgb') -> Optional[np.ndarray]:
+    """
+    Decode base64 image string to an image array (RGB by default, ready for MediaPipe).
+    
+    Args:
+        base64_string: Base64 encoded image string (with or without data URL prefix)
+        color_space: Channel order of the returned array, 'bgr' (OpenCV) or 'rgb' (MediaPipe)
+        
+    Returns:
+        Image array or None if decoding fails (see decode_image_bytes)
+    """
+    image_bytes = decode_base64_payload(base64_string)
+    if image_bytes is None:
+        return None
+    return decode_image_bytes(image_bytes, color_space)
+
+def image_cache_key(image_bytes: bytes, variant: str = '') -> Optional[bytes]:
+    """
+    Hash image bytes for the response cache.
+    
+    Args:
+        image_bytes: Encoded image bytes
+        variant: Request options that change the response (e.g. landmark format)
+        
+    Returns:
+        32-byte digest (BLAKE3, or BLAKE2b when blake3 is not installed), or None
+        if the image is too large to be worth caching
+    """
+    if RESPONSE_CACHE_SIZE <= 0 or len(image_bytes) > RESPONSE_CACHE_MAX_IMAGE_BYTES:
+        return None
+    if blake3 is not None:
+        digest = blake3(image_bytes).digest()
+    else:
+        digest = hashlib.blake2b(image_bytes, digest_size=32).digest()
+    return digest + variant.encode()
+
+def get_cached_response(cache_key: Optional[bytes]) -> Optional[bytes]:
+    """Return the cached response body (up to the timestamp) for an image hash, if present and not expired."""
+    if cache_key is None:
         return None
+    with response_cache_lock:
+        entry = response_cache.get(cache_key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del response_cache[cache_key]
+            return None
+        response_cache.move_to_end(cache_key)
+        return entry[1]
+
+def cache_response(cache_key: Optional[bytes], body_prefix: bytes):
+    """Store a response body (up to the timestamp) for an image hash, evicting the oldest entries."""
+    if cache_key is None:
+        return
+    with response_cache_lock:
+        response_cache[cache_key] = (time.monotonic() + RESPONSE_CACHE_TTL, body_prefix)
+        response_cache.move_to_end(cache_key)
+        while len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+
+def downscale_for_inference(image: np.ndarray) -> np.ndarray:
+    """
+    Shrink an image so its longest side is at most MAX_INFERENCE_DIMENSION pixels.
+    Landmarks are normalized to [0, 1], so results need no rescaling afterwards.
+    
+    Args:
+        image: Image array (any channel order)
+        
+    Returns:
+        The original image if it is small enough, otherwise a resized copy held in
+        this thread's scratch buffer
+    """
+    height, width = image.shape[:2]
+    longest_side = max(height, width)
+    if longest_side <= MAX_INFERENCE_DIMENSION:
+        return image
+    
+    scale = MAX_INFERENCE_DIMENSION / longest_side
+    new_width = max(1, round(width * scale))
+    new_height = max(1, round(height * scale))
+    return cv2.resize(image, (new_width, new_height),
+                      dst=get_scratch_image(new_height, new_width, slot='resize'),
+                      interpolation=cv2.INTER_AREA)
+
+def unexpected_landmark_count(results) -> Optional[int]:
+    """
+    Get the landmark count of the first detected hand that does not have all 21 landmarks.
+    
+    Args:
+        results: MediaPipe Hands results object with at least one hand
+        
+    Returns:
+        That hand's landmark count, or None if every hand is complete
+    """
+    for hand in results.multi_hand_landmarks:
+        if len(hand.landmark) != len(LANDMARK_NAMES):
+            return len(hand.landmark)
+    return None
+
+def read_landmark_fields(results, getter: attrgetter, num_fields: int, dtype) -> np.ndarray:
+    """
+    Stream landmark attributes of every detected hand straight into one preallocated array,
+    without building per-landmark tuples or nested lists first.
+    
+    Args:
+        results: MediaPipe Hands results object with at least one hand
+        getter: attrgetter of the num_fields landmark attributes to read, e.g. LANDMARK_XYZ
+        num_fields: Number of attributes getter returns
+        dtype: Array dtype
+        
+    Returns:
+        (N_hands, 21, num_fields) array
+        
+    Raises:
+        ValueError: If a hand does not have exactly 21 landmarks
+    """
+    landmark_count = unexpected_landmark_count(results)
+    if landmark_count is not None:
+        raise ValueError(f"Expected {len(LANDMARK_NAMES)} landmarks per hand, got {landmark_count}")
+    
+    hands = results.multi_hand_landmarks
+    landmarks = chain.from_iterable(hand.landmark for hand in hands)
+    values = chain.from_iterable(map(getter, landmarks))
+    shape = (len(hands), len(LANDMARK_NAMES), num_fields)
+    return np.fromiter(values, dtype=dtype, count=shape[0] * shape[1] * num_fields).reshape(shape)
+
+def extract_landmark_array(results) -> np.ndarray:
+    """
+    Read every detected hand into one array.
+    
+    Args:
+        results: MediaPipe Hands results object with at least one hand
+        
+    Returns:
+        (N_hands, 21, 4) float64 array of x, y, z, visibility
+    """
+    return read_landmark_fields(results, LANDMARK_XYZV, 4, np.float64)
+
+def landmark_features(results, dtype=np.float32) -> np.ndarray:
+    """
+    Read x, y, z of every detected hand into one array, rounded like the recorded dataset.
+    
+    Args:
+        results: MediaPipe Hands results object with at least one hand
+        dtype: Array dtype; float32 for classifier input, float64 for values written to CSV
+        
+    Returns:
+        (N_hands, 21, 3) array; row i of hand h is the (x, y, z) of landmark i
+    """
+    features = read_landmark_fields(results, LANDMARK_XYZ, 3, dtype)
+    np.round(features, 4, out=features)
+    return features
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _normalize_landmark_rows_jit(rows):
+        for r in range(rows.shape[0]):
+            wrist_x, wrist_y, wrist_z = rows[r, 0], rows[r, 1], rows[r, 2]
+            max_norm_sq = 0.0
+            for i in range(0, rows.shape[1], 3):
+                x = rows[r, i] - wrist_x
+                y = rows[r, i + 1] - wrist_y
+                z = rows[r, i + 2] - wrist_z
+                rows[r, i], rows[r, i + 1], rows[r, i + 2] = x, y, z
+                max_norm_sq = max(max_norm_sq, x * x + y * y + z * z)
+            if max_norm_sq > 0.0:
+                inv_scale = 1.0 / np.sqrt(max_norm_sq)
+                for i in range(rows.shape[1]):
+                    rows[r, i] *= inv_scale
+else:
+    _normalize_landmark_rows_jit = None
+
+def normalize_landmark_rows(rows: np.ndarray) -> np.ndarray:
+    """
+    Make flattened hand rows translation and scale invariant, in place: subtract the
+    wrist from every point and divide by the distance of the farthest point.
+    
+    Args:
+        rows: (N, 63) float32 array of x0, y0, z0, x1, ... rows
+        
+    Returns:
+        The same array, normalized
+    """
+    if _normalize_landmark_rows_jit is not None:
+        _normalize_landmark_rows_jit(rows)
+        return rows
+    
+    points = rows.reshape(len(rows), -1, 3)
+    points -= points[:, :1]
+    scale = np.sqrt((points * points).sum(axis=2)).max(axis=1)
+    scale[scale == 0] = 1
+    points /= scale[:, None, None]
+    return rows
 
-def process_hand_landmarks(results) -> List[Dict[str, Any]]:
+def process_hand_landmarks(results, landmark_format: str = 'aos') -> List[Dict[str, Any]]:
     """
     Process MediaPipe hand landmarks results into structured format.
     
     Args:
         results: MediaPipe Hands results object
+        landmark_format: 'aos' for one dict per landmark, or 'soa' for parallel
+            x/y/z/visibility arrays per hand (about 4x smaller JSON)
         
     Returns:
         List of hand detection results with landmarks and metadata
@@ -108,106 +1155,164 @@ def process_hand_landmarks(results) -> List[Dict[str, Any]]:
     if not results.multi_hand_landmarks:
         return []
     
+    # Round the whole batch once instead of every value separately
+    coords = extract_landmark_array(results)
+    np.round(coords, 4, out=coords)
+    
+    if landmark_format == 'soa':
+        # (N_hands, 4, 21): one contiguous column per coordinate
+        hand_rows = coords.transpose(0, 2, 1).tolist()
+    else:
+        hand_rows = coords.tolist()
+    
     processed_hands = []
     
-    for hand_idx, (hand_landmarks, handedness) in enumerate(
-        zip(results.multi_hand_landmarks, results.multi_handedness)
+    for hand_idx, (hand_data, handedness) in enumerate(
+        zip(hand_rows, results.multi_handedness)
     ):
-        # Extract landmark coordinates
-        landmarks = []
-        for idx, landmark in enumerate(hand_landmarks.landmark):
-            landmarks.append({
-                'index': idx,
-                'name': get_landmark_name(idx),
-                'x': round(landmark.x, 4),
-                'y': round(landmark.y, 4),
-                'z': round(landmark.z, 4),
-                'visibility': round(landmark.visibility, 4) if hasattr(landmark, 'visibility') else 1.0
-            })
-        
         # Get handedness information
         hand_label = handedness.classification[0].label
         hand_confidence = handedness.classification[0].score
         
-        processed_hands.append({
+        hand_result = {
             'handIndex': hand_idx,
             'handedness': hand_label.lower(),  # 'left' or 'right'
-            'confidence': round(hand_confidence, 4),
-            'landmarks': landmarks,
-            'totalLandmarks': len(landmarks)
-        })
+            'confidence': round(hand_confidence, 4)
+        }
+        
+        if landmark_format == 'soa':
+            xs, ys, zs, visibilities = hand_data
+            hand_result.update({
+                'names': LANDMARK_NAMES,
+                'x': xs,
+                'y': ys,
+                'z': zs,
+                'visibility': visibilities,
+                'totalLandmarks': len(xs)
+            })
+        else:
+            # Extract landmark coordinates
+            landmarks = [
+                {
+                    'index': idx,
+                    'name': name,
+                    'x': x,
+                    'y': y,
+                    'z': z,
+                    'visibility': visibility
+                }
+                for idx, (name, (x, y, z, visibility)) in enumerate(zip(LANDMARK_NAMES, hand_data))
+            ]
+            hand_result.update({
+                'landmarks': landmarks,
+                'totalLandmarks': len(landmarks)
+            })
+        
+        processed_hands.append(hand_result)
     
     return processed_hands
 
-def get_landmark_name(index: int) -> str:
+def initialize_csv_file():
+    """Initialize CSV file with headers if it doesn't exist."""
+    if not os.path.exists(CSV_FILE_PATH):
+        with open(CSV_FILE_PATH, 'w', newline='') as csv_file:
+            csv.writer(csv_file).writerow(CSV_HEADERS)
+        logger.info(f"✅ Created CSV file: {CSV_FILE_PATH}")
+
+def csv_handle_is_current() -> bool:
     """
-    Get the name of a hand landmark by its index.
+    Check whether the cached append handle still points at the file at CSV_FILE_PATH.
     
-    Args:
-        index: Landmark index (0-20)
-        
     Returns:
-        Human-readable landmark name
+        False if the path changed, or the file was removed or replaced (e.g. by an
+        editor or a dataset upload), so rows would land in an unlinked inode
+    """
+    csv_file = _csv_appender['file']
+    if csv_file is None or _csv_appender['path'] != CSV_FILE_PATH:
+        return False
+    try:
+        on_disk = os.stat(CSV_FILE_PATH)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(csv_file.fileno())
+    return (on_disk.st_dev, on_disk.st_ino) == (opened.st_dev, opened.st_ino)
+
+def get_csv_writer():
     """
-    landmark_names = [
-        'WRIST',
-        'THUMB_CMC', 'THUMB_MCP', 'THUMB_IP', 'THUMB_TIP',
-        'INDEX_FINGER_MCP', 'INDEX_FINGER_PIP', 'INDEX_FINGER_DIP', 'INDEX_FINGER_TIP',
-        'MIDDLE_FINGER_MCP', 'MIDDLE_FINGER_PIP', 'MIDDLE_FINGER_DIP', 'MIDDLE_FINGER_TIP',
-        'RING_FINGER_MCP', 'RING_FINGER_PIP', 'RING_FINGER_DIP', 'RING_FINGER_TIP',
-        'PINKY_MCP', 'PINKY_PIP', 'PINKY_DIP', 'PINKY_TIP'
-    ]
+    Get the append-mode csv.writer for CSV_FILE_PATH, (re)opening it if the path
+    changed or the file was removed or replaced. Call with _csv_appender_lock held.
     
-    return landmark_names[index] if index < len(landmark_names) else f'LANDMARK_{index}'
+    Returns:
+        Tuple of (file handle, csv.writer)
+    """
+    if not csv_handle_is_current():
+        if _csv_appender['file'] is not None:
+            _csv_appender['file'].close()
+        csv_file = open(CSV_FILE_PATH, 'a', newline='', buffering=1 << 16)
+        writer = csv.writer(csv_file)
+        # Decide on the header from the opened handle, not a prior exists() check, so a
+        # file removed between the stat and the open still gets one
+        if csv_file.tell() == 0:
+            writer.writerow(CSV_HEADERS)
+            csv_file.flush()
+            logger.info(f"✅ Created CSV file: {CSV_FILE_PATH}")
+        _csv_appender.update(path=CSV_FILE_PATH, file=csv_file, writer=writer)
+    return _csv_appender['file'], _csv_appender['writer']
 
-def initialize_csv_file():
-    """Initialize CSV file with headers if it doesn't exist."""
-    if not os.path.exists(CSV_FILE_PATH):
-        headers = ['gesture_name']
-        # Add coordinate columns for 21 landmarks (x0,y0,z0, x1,y1,z1, ..., x20,y20,z20)
-        for i in range(21):
-            headers.extend([f'x{i}', f'y{i}', f'z{i}'])
-        
-        df = pd.DataFrame(columns=headers)
-        df.to_csv(CSV_FILE_PATH, index=False)
-        logger.info(f"✅ Created CSV file: {CSV_FILE_PATH}")
+def get_dataset_counts() -> Optional[Counter]:
+    """
+    Get the number of recorded samples per gesture without re-reading the dataset
+    unless the file changed behind this process's back.
+    
+    Returns:
+        Counter of gesture_name -> samples, or None if there is no dataset file
+    """
+    try:
+        size = os.stat(CSV_FILE_PATH).st_size
+    except FileNotFoundError:
+        return None
+    
+    with _dataset_stats_lock:
+        if _dataset_stats['path'] != CSV_FILE_PATH or _dataset_stats['size'] != size:
+            gesture_names = pd.read_csv(CSV_FILE_PATH, usecols=['gesture_name'], dtype={'gesture_name': str})
+            _dataset_stats.update(
+                path=CSV_FILE_PATH, size=size, counts=Counter(gesture_names['gesture_name'])
+            )
+        return Counter(_dataset_stats['counts'])
 
-def save_landmarks_to_csv(gesture_name: str, landmarks: List[Dict[str, Any]]) -> bool:
+def save_landmarks_to_csv(gesture_name: str, hand_landmarks: np.ndarray) -> bool:
     """
     Save hand landmarks to CSV file.
     
     Args:
         gesture_name: Name of the gesture
-        landmarks: List of landmark dictionaries from process_hand_landmarks
+        hand_landmarks: (21, 3) x/y/z array of one hand from landmark_features
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        # Extract coordinates from landmarks (assuming first hand if multiple detected)
-        if not landmarks:
-            logger.error("No landmarks provided to save")
-            return False
-        
-        first_hand = landmarks[0]['landmarks']
-        if len(first_hand) != 21:
-            logger.error(f"Expected 21 landmarks, got {len(first_hand)}")
+        if hand_landmarks.shape != (21, 3):
+            logger.error(f"Expected 21 landmarks, got array of shape {hand_landmarks.shape}")
             return False
         
-        # Create data row
-        row_data = {'gesture_name': gesture_name}
-        for i, landmark in enumerate(first_hand):
-            row_data[f'x{i}'] = landmark['x']
-            row_data[f'y{i}'] = landmark['y']
-            row_data[f'z{i}'] = landmark['z']
-        
-        # Append to CSV
-        df = pd.DataFrame([row_data])
-        if os.path.exists(CSV_FILE_PATH):
-            df.to_csv(CSV_FILE_PATH, mode='a', header=False, index=False)
-        else:
-            initialize_csv_file()
-            df.to_csv(CSV_FILE_PATH, mode='a', header=False, index=False)
+        # Columns are x0, y0, z0, x1, ... so a row-major ravel lines up with the header
+        row = [gesture_name]
+        row.extend(hand_landmarks.ravel().tolist())
+        
+        # Append through the shared handle; flush so /train and other workers see the row
+        with _csv_appender_lock:
+            csv_file, writer = get_csv_writer()
+            size_before = os.fstat(csv_file.fileno()).st_size
+            writer.writerow(row)
+            csv_file.flush()
+            size_after = os.fstat(csv_file.fileno()).st_size
+            
+            # Keep the in-memory counts current if they were up to date before this row
+            with _dataset_stats_lock:
+                if _dataset_stats['path'] == CSV_FILE_PATH and _dataset_stats['size'] == size_before:
+                    _dataset_stats['counts'][gesture_name] += 1
+                    _dataset_stats['size'] = size_after
         
         logger.info(f"✅ Saved landmarks for gesture '{gesture_name}' to CSV")
         return True
@@ -216,23 +1321,290 @@ def save_landmarks_to_csv(gesture_name: str, landmarks: List[Dict[str, Any]]) ->
         logger.error(f"Failed to save landmarks to CSV: {e}")
         return False
 
-def load_model() -> Optional[RandomForestClassifier]:
-    """Load the trained gesture recognition model."""
+def save_model(model: Any):
+    """
+    Write the model to a temporary file and atomically replace MODEL_FILE_PATH, so
+    processes reading the old file never see a partial one.
+    """
+    temp_path = f"{MODEL_FILE_PATH}.{os.getpid()}.tmp"
     try:
-        if os.path.exists(MODEL_FILE_PATH):
-            model = joblib.load(MODEL_FILE_PATH)
-            logger.info("✅ Loaded trained model")
-            return model
-        else:
+        joblib.dump(model, temp_path, compress=0)
+        os.replace(temp_path, MODEL_FILE_PATH)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+class OnnxGestureClassifier:
+    """
+    ONNX Runtime session behind the classes_ / predict_proba interface of the trained model.
+    
+    The forest is compiled once per loaded model into a graph with a fixed (N, 63) float32
+    input, so each call skips sklearn's input validation and per-tree Python loop.
+    """
+    
+    def __init__(self, model: Any):
+        """
+        Args:
+            model: Fitted classifier supported by skl2onnx (e.g. RandomForestClassifier)
+            
+        Raises:
+            ImportError: If skl2onnx or onnxruntime is not installed
+        """
+        # Imported here, never at module level: onnxruntime's native thread pools do not
+        # survive fork, so a preloaded gunicorn master must not load it (see gunicorn.conf.py)
+        import onnxruntime
+        from skl2onnx import to_onnx
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        onnx_model = to_onnx(
+            model,
+            initial_types=[('landmarks', FloatTensorType([None, 63]))],
+            options={id(model): {'zipmap': False}}  # Plain probability matrix, not dicts
+        )
+        options = onnxruntime.SessionOptions()
+        # Request threads and gunicorn workers already use the cores
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(onnx_model.SerializeToString(), options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = [self.session.get_outputs()[1].name]
+        self.classes_ = model.classes_
+        self.landmarks_normalized_ = getattr(model, 'landmarks_normalized_', False)
+    
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for (N, 63) feature rows, columns ordered like classes_."""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        # float64 like sklearn's output, which the stdlib JSON fallback can serialize
+        return self.session.run(self.output_names, {self.input_name: features})[0].astype(np.float64)
+
+def compile_classifier(model: Any) -> Any:
+    """
+    Wrap a freshly loaded model for CLASSIFIER_RUNTIME.
+    
+    Returns:
+        OnnxGestureClassifier when the ONNX runtime is selected and the model converts,
+        otherwise the model itself
+    """
+    if CLASSIFIER_RUNTIME != 'onnx' or getattr(model, 'onnx_disabled_', False):
+        return model
+    
+    try:
+        classifier = OnnxGestureClassifier(model)
+        logger.info("✅ Compiled trained model to ONNX")
+        return classifier
+    except ImportError:
+        logger.warning("CLASSIFIER_RUNTIME=onnx needs skl2onnx and onnxruntime; using sklearn")
+        return model
+    except Exception as e:
+        logger.warning(f"ONNX conversion failed, using the {type(model).__name__} directly: {e}")
+        return model
+
+def model_file_signature() -> tuple:
+    """
+    Identify the current MODEL_FILE_PATH contents for the model cache.
+    
+    save_model() always installs a new inode with os.replace, so the inode catches a retrain
+    that lands within one tick of a filesystem with coarse timestamps.
+    
+    Returns:
+        Tuple of (st_ino, st_mtime_ns, st_size)
+        
+    Raises:
+        FileNotFoundError: If there is no model file
+    """
+    stat_result = os.stat(MODEL_FILE_PATH)
+    return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+def load_model() -> Optional[Any]:
+    """Load the trained gesture recognition model, reusing the cached copy while the file is unchanged."""
+    try:
+        try:
+            signature = model_file_signature()
+        except FileNotFoundError:
             logger.warning("No trained model found")
             return None
+        
+        with _model_cache_lock:
+            if _model_cache['signature'] != signature:
+                # No mmap_mode: sklearn's Tree.__setstate__ copies the node arrays into the heap
+                # anyway, so memory-mapping only helps estimators with plain ndarray attributes
+                _model_cache['model'] = compile_classifier(joblib.load(MODEL_FILE_PATH))
+                _model_cache['signature'] = signature
+                logger.info("✅ Loaded trained model")
+            return _model_cache['model']
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         return None
 
+# Hyperparameters echoed in the /train response, per classifier
+REPORTED_MODEL_PARAMS = {
+    'random_forest': ('n_estimators', 'max_depth', 'min_samples_split'),
+    'lightgbm': ('n_estimators', 'num_leaves', 'min_child_samples')
+}
+
+def create_gesture_classifier(total_samples: int):
+    """
+    Create the untrained classifier selected by GESTURE_CLASSIFIER, sized for the dataset.
+    
+    Args:
+        total_samples: Number of recorded samples
+        
+    Returns:
+        Tuple of (classifier, classifier name); falls back to the random forest
+        if LightGBM is requested but not installed
+    """
+    if GESTURE_CLASSIFIER == 'lightgbm':
+        if lightgbm is not None:
+            return lightgbm.LGBMClassifier(
+                n_estimators=min(200, max(20, total_samples * 2)),
+                num_leaves=31,
+                min_child_samples=max(1, min(20, total_samples // 10)),  # Small datasets need small leaves
+                class_weight='balanced',
+                random_state=42,
+                verbose=-1
+            ), 'lightgbm'
+        logger.warning("GESTURE_CLASSIFIER=lightgbm but lightgbm is not installed; using random forest")
+    
+    return RandomForestClassifier(
+        n_estimators=min(100, max(10, total_samples * 2)),  # Scale trees with data size
+        random_state=42,
+        max_depth=min(10, max(3, total_samples // 5)),  # Prevent overfitting on small data
+        min_samples_split=max(2, min(5, total_samples // 10)),  # Adaptive split threshold
+        min_samples_leaf=1,  # Allow single sample leaves for small datasets
+        max_features='sqrt',  # Explicit, so a changed library default cannot alter models
+        bootstrap=True,
+        class_weight='balanced',  # Handle imbalanced classes
+        n_jobs=-1  # Build trees on all cores
+    ), 'random_forest'
+
+def predict_proba_batch(items: List[tuple]) -> List[Any]:
+    """
+    Classify queued feature rows with one predict_proba call per model.
+    
+    Args:
+        items: (model, (63,) float32 feature row) pairs queued by /detect requests
+        
+    Returns:
+        Class probability row (or the raised exception) for each item, in order
+    """
+    batch_results: List[Any] = [None] * len(items)
+    
+    # Requests racing a retrain may hold different models; batch each one separately
+    indices_by_model: Dict[int, List[int]] = {}
+    for index, (model, _) in enumerate(items):
+        indices_by_model.setdefault(id(model), []).append(index)
+    
+    for indices in indices_by_model.values():
+        model = items[indices[0]][0]
+        try:
+            probabilities = model.predict_proba(np.stack([items[index][1] for index in indices]))
+            for index, row in zip(indices, probabilities):
+                batch_results[index] = row
+        except Exception as e:
+            for index in indices:
+                batch_results[index] = e
+    return batch_results
+
+classifier_batcher = MicroBatcher(
+    predict_proba_batch,
+    max_batch_size=CLASSIFIER_BATCH_SIZE,
+    max_wait_ms=CLASSIFIER_BATCH_MAX_WAIT_MS,
+    name='classifier-batcher'
+)
+
+def batch_predict(model: Any, rgb_images: List[np.ndarray], session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Detect hands in each image and classify the first hand with the trained model.
+    
+    MediaPipe still processes one image at a time, but all images are queued on the
+    batcher together and their feature rows go through a single predict_proba call.
+    
+    Args:
+        model: Trained gesture classifier
+        rgb_images: RGB image arrays (already downscaled for inference)
+        session_id: Optional streaming session; its images are tracked in order
+        
+    Returns:
+        /detect result fields (without timestamp) for each image, in order
+        
+    Raises:
+        Exception: If MediaPipe hand detection fails
+    """
+    if inference_process is not None:
+        hand_results = inference_process.submit_many(rgb_images, session_id)
+    elif session_id:
+        hand_results = [detect_hands(rgb_image, session_id) for rgb_image in rgb_images]
+    else:
+        hand_results = hands_batcher.submit_many(rgb_images)
+    
+    predictions: List[Dict[str, Any]] = []
+    rows, row_owners = [], []
+    for results in hand_results:
+        if not results.multi_hand_landmarks:
+            predictions.append({
+                'success': False,
+                'message': 'No hands detected in the image. Please ensure your hand is clearly visible.',
+                'predicted_gesture': None,
+                'confidence': 0.0
+            })
+            continue
+        
+        # The fixed-size feature array needs all 21 landmarks of every hand
+        landmark_count = unexpected_landmark_count(results)
+        if landmark_count is not None:
+            predictions.append({
+                'success': False,
+                'message': f'Expected 21 landmarks, got {landmark_count}.',
+                'predicted_gesture': None,
+                'confidence': 0.0
+            })
+            continue
+        
+        # Extract features for prediction (using first hand)
+        features = landmark_features(results)
+        
+        # Flattened (63,) x0, y0, z0, x1, ... row of the first hand
+        rows.append(features[0].reshape(63))
+        row_owners.append(len(predictions))
+        predictions.append({
+            'handsDetected': len(features),
+            'handedness': results.multi_handedness[0].classification[0].label.lower()
+        })
+    
+    if not rows:
+        return predictions
+    
+    feature_rows = np.stack(rows)
+    if getattr(model, 'landmarks_normalized_', False):
+        normalize_landmark_rows(feature_rows)
+    
+    # A single row is batched with other requests; a multi-image request is its own batch.
+    # predict() is just the argmax of predict_proba(), so one pass gives both
+    if len(rows) == 1:
+        probability_rows = [classifier_batcher.submit((model, feature_rows[0]))]
+    else:
+        probability_rows = model.predict_proba(feature_rows)
+    
+    classes = model.classes_
+    for index, prediction_proba in zip(row_owners, probability_rows):
+        best_index = prediction_proba.argmax()
+        prediction = classes[best_index]
+        confidence = prediction_proba[best_index]
+        logger.info(f"✅ Predicted gesture: {prediction} (confidence: {confidence:.4f})")
+        
+        predictions[index] = {
+            'success': True,
+            'predicted_gesture': prediction,
+            'confidence': round(confidence, 4),
+            'all_probabilities': {k: round(v, 4) for k, v in zip(classes, prediction_proba)},
+            **predictions[index]
+        }
+    return predictions
+
 def train_gesture_model() -> Dict[str, Any]:
     """
-    Train a RandomForest classifier on the gesture data.
+    Train the gesture classifier (see create_gesture_classifier) on the recorded data.
     
     Returns:
         Dictionary with training results and metrics
@@ -281,7 +1653,10 @@ def train_gesture_model() -> Dict[str, Any]:
             }
         
         # Prepare features and labels
-        X = df.drop('gesture_name', axis=1).values
+        # float32 matches what /detect feeds the model (sklearn trees compare in float32 anyway)
+        X = np.ascontiguousarray(df.drop('gesture_name', axis=1).to_numpy(dtype=np.float32))
+        if NORMALIZE_LANDMARKS:
+            normalize_landmark_rows(X)
         y = df['gesture_name'].values
         
         # Dynamic test size calculation
@@ -306,16 +1681,12 @@ def train_gesture_model() -> Dict[str, Any]:
             )
         
         # Train model with parameters suitable for small datasets
-        model = RandomForestClassifier(
-            n_estimators=min(100, max(10, total_samples * 2)),  # Scale trees with data size
-            random_state=42,
-            max_depth=min(10, max(3, total_samples // 5)),  # Prevent overfitting on small data
-            min_samples_split=max(2, min(5, total_samples // 10)),  # Adaptive split threshold
-            min_samples_leaf=1,  # Allow single sample leaves for small datasets
-            bootstrap=True,
-            class_weight='balanced'  # Handle imbalanced classes
-        )
+        model, classifier_name = create_gesture_classifier(total_samples)
         model.fit(X_train, y_train)
+        if classifier_name == 'random_forest':
+            # Predicting one row per request: thread fan-out across trees would only add overhead
+            model.n_jobs = None
+        model.landmarks_normalized_ = NORMALIZE_LANDMARKS
         
         # Evaluate model
         y_pred = model.predict(X_test)
@@ -324,8 +1695,28 @@ def train_gesture_model() -> Dict[str, Any]:
         # Additional metrics for small datasets
         train_accuracy = model.score(X_train, y_train)
         
-        # Save model
-        joblib.dump(model, MODEL_FILE_PATH)
+        model_params = model.get_params()
+        
+        # The ONNX graph evaluates in float32; keep it only if it holds the held-out accuracy.
+        # The verdict is saved with the model so every worker process follows it
+        runtime_model = compile_classifier(model)
+        runtime_accuracy = accuracy
+        if runtime_model is not model:
+            runtime_accuracy = accuracy_score(
+                y_test, runtime_model.classes_[runtime_model.predict_proba(X_test).argmax(axis=1)]
+            )
+            if accuracy - runtime_accuracy > MAX_ONNX_ACCURACY_DROP:
+                logger.warning(f"ONNX model accuracy {runtime_accuracy:.4f} is below {accuracy:.4f}; "
+                               f"serving the {classifier_name} model directly")
+                model.onnx_disabled_ = True
+                runtime_model = model
+                runtime_accuracy = accuracy
+        
+        # Save model and make it the cached one, so the next /detect skips the reload
+        save_model(model)
+        with _model_cache_lock:
+            _model_cache['model'] = runtime_model
+            _model_cache['signature'] = model_file_signature()
         
         return {
             'success': True,
@@ -339,51 +1730,262 @@ def train_gesture_model() -> Dict[str, Any]:
             'testingSamples': len(X_test),
             'testSize': round(test_size, 3),
             'modelParams': {
-                'n_estimators': model.n_estimators,
-                'max_depth': model.max_depth,
-                'min_samples_split': model.min_samples_split
-            }
+                'classifier': classifier_name,
+                **{key: model_params[key] for key in REPORTED_MODEL_PARAMS[classifier_name]}
+            },
+            'runtime': 'onnx' if isinstance(runtime_model, OnnxGestureClassifier) else 'sklearn',
+            'runtimeAccuracy': round(runtime_accuracy, 4)
+        }
+        
+    except Exception as e:
+        logger.error(f"Training failed: {e}")
+        return {
+            'success': False,
+            'message': f'Training failed: {str(e)}'
+        }
+
+# Pre-serialized bodies for the constant endpoints, keyed by whether the model is loaded
+# (and, for /health, by the inference process state)
+TIMESTAMP_PLACEHOLDER = '__TIMESTAMP__'
+health_body_templates: Dict[tuple, bytes] = {}
+model_info_bodies: Dict[bool, bytes] = {}
+
+def build_health_body_template(model_loaded: bool, inference_state: Optional[str] = None) -> bytes:
+    """
+    Serialize the /health body once per state, with a placeholder for the timestamp.
+    
+    Args:
+        model_loaded: Whether the MediaPipe models were initialized
+        inference_state: InferenceProcess.state with INFERENCE_PROCESS on, else None
+    """
+    template = health_body_templates.get((model_loaded, inference_state))
+    if template is None:
+        body = {
+            'status': 'OK' if inference_state in (None, 'running') else 'DEGRADED',
+            'timestamp': TIMESTAMP_PLACEHOLDER,
+            'modelLoaded': model_loaded and inference_state in (None, 'running'),
+            'service': 'Hand Gesture Recognition API',
+            'version': API_VERSION
         }
+        if inference_state is not None:
+            body['inferenceProcess'] = inference_state
+        template = app.json.dumps(body).encode()
+        health_body_templates[(model_loaded, inference_state)] = template
+    return template
+
+def build_model_info_body(model_loaded: bool) -> bytes:
+    """Serialize the fully static /model-info body once."""
+    body = model_info_bodies.get(model_loaded)
+    if body is None:
+        backend, delegate = hands_backend(hands_model)
+        body = app.json.dumps({
+            'modelLoaded': model_loaded,
+            'modelType': 'MediaPipe Hands',
+            'version': mp.__version__,
+            'apiVersion': API_VERSION,
+            'backend': backend,
+            'delegate': delegate,
+            'inferenceProcess': isinstance(hands_model, InferenceProcess),
+            'description': 'MediaPipe Hands for real-time hand landmark detection',
+            'maxHands': 2,
+            'landmarks': 21,
+            'inputFormat': 'base64-encoded image (data:image/...)',
+            'inputFormats': {
+                'POST /detect-gesture': 'JSON body {"image": base64-encoded image, "session_id"?: string} '
+                                        'or multipart/form-data with an "image" file part',
+                'POST /detect-gesture-raw': 'raw image bytes with Content-Type image/jpeg, image/png, ...',
+                'POST /detect-gesture-bin': 'raw image bytes or JSON body; responds with application/msgpack '
+                                            'int16 coordinates (divide by 10000)',
+                'POST /detect': 'JSON body {"image": base64-encoded image, "session_id"?: string}, '
+                                'multipart/form-data with an "image" file part, or raw image bytes '
+                                'with Content-Type image/jpeg, image/png, ... (?session_id=)'
+            },
+            'landmarkFormats': {
+                'aos': 'default; one {index, name, x, y, z, visibility} object per landmark',
+                'soa': '?format=soa; per hand names/x/y/z/visibility arrays'
+            },
+            'maxImageSize': '50MB',
+            'detectionConfidence': 0.7,
+            'trackingConfidence': 0.5
+        }).encode()
+        model_info_bodies[model_loaded] = body
+    return body
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint; 503 while the inference process is down or restarting."""
+    inference_state = inference_process.state if inference_process is not None else None
+    body = build_health_body_template(hands_model is not None, inference_state).replace(
+        TIMESTAMP_PLACEHOLDER.encode(), now_iso().encode()
+    )
+    status = 200 if inference_state in (None, 'running') else 503
+    return app.response_class(body, status=status, mimetype='application/json')
+
+@app.route('/model-info', methods=['GET'])
+def model_info():
+    """Get information about the loaded model."""
+    body = build_model_info_body(hands_model is not None)
+    response = app.response_class(body, mimetype='application/json')
+    # Static body: let browsers and load balancers revalidate with a 304
+    response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    return response.make_conditional(request)
+
+# Pre-serialized pieces of the /detect-gesture body. Per request only the hand count, the
+# predictions and the image sizes are encoded; the body is cached up to the timestamp value
+DETECTION_BODY_HEAD = b'{"success":true,"handsDetected":'
+DETECTION_BODY_PREDICTIONS = b',"predictions":'
+DETECTION_BODY_PROCESSING_INFO = (
+    b',"processingInfo":{"modelType":"MediaPipe Hands","modelVersion":'
+    + app.json.dumps(mp.__version__).encode() + b','
+)
+DETECTION_BODY_TIMESTAMP = b',"timestamp":"'
+NO_HANDS_BODY_PREFIX = (
+    b'{"success":true,"handsDetected":0,"message":"No hands detected in the image","predictions":[]'
+    + DETECTION_BODY_TIMESTAMP
+)
+
+def timestamped_response(body_prefix: bytes, status: int = 200):
+    """Finish a pre-serialized JSON body ending in '"timestamp":"' with the current timestamp."""
+    return app.response_class(body_prefix + now_iso().encode() + b'"}', status=status,
+                              mimetype='application/json')
+
+def read_json_body() -> Optional[Dict[str, Any]]:
+    """
+    Parse the request body as a JSON object, without keeping a cached copy of the raw bytes.
+    
+    Returns:
+        The decoded object, or None if the body is empty, malformed or not a JSON object
+    """
+    data = request.get_json(cache=False, silent=True)
+    return data if isinstance(data, dict) else None
+
+def read_request_fields() -> Optional[Dict[str, Any]]:
+    """
+    Read the fields of a JSON or multipart/form-data request body.
+    
+    For multipart requests the 'image' file part (and any repeated 'images' parts, as a
+    list) is returned as raw encoded bytes, so no base64 step is needed; JSON requests
+    carry them as base64 strings.
+    
+    Returns:
+        Dictionary of request fields, or None if the body is missing or malformed
+    """
+    if request.mimetype == 'multipart/form-data':
+        fields = request.form.to_dict()
+        upload = request.files.get('image')
+        if upload is not None:
+            fields['image'] = upload.read()
+        uploads = request.files.getlist('images')
+        if uploads:
+            fields['images'] = [upload.read() for upload in uploads]
+        return fields
+    return read_json_body()
+
+def decode_image_field(image: Any) -> Optional[bytes]:
+    """
+    Get the encoded image bytes of an 'image' request field.
+    
+    Args:
+        image: Raw bytes from a multipart upload or a base64 string from a JSON body
         
-    except Exception as e:
-        logger.error(f"Training failed: {e}")
-        return {
-            'success': False,
-            'message': f'Training failed: {str(e)}'
-        }
+    Returns:
+        Encoded image bytes (JPEG, PNG, ...) or None if decoding fails
+    """
+    if isinstance(image, bytes):
+        return image or None
+    return decode_base64_payload(image)
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint."""
-    return jsonify({
-        'status': 'OK',
-        'timestamp': datetime.now().isoformat(),
-        'modelLoaded': hands_model is not None,
-        'service': 'Hand Gesture Recognition API',
-        'version': '1.0.0'
-    })
+def decode_for_inference(image_bytes: bytes) -> Optional[tuple]:
+    """
+    Decode image bytes into the read-only, size-capped RGB frame fed to MediaPipe.
+    
+    Args:
+        image_bytes: Encoded image (JPEG, PNG, ...)
+        
+    Returns:
+        Tuple of (rgb_image, sizes) where sizes holds the 'imageSize' of the upload and
+        the 'processedSize' sent to the model, or None if decoding fails
+    """
+    # Decode straight to RGB for MediaPipe
+    rgb_image = decode_image_bytes(image_bytes)
+    if rgb_image is None:
+        return None
+    image_height, image_width = rgb_image.shape[:2]
+    
+    # Cap the resolution; MediaPipe would downscale internally anyway
+    rgb_image = downscale_for_inference(rgb_image)
+    processed_height, processed_width = rgb_image.shape[:2]
+    
+    # Mark read-only so MediaPipe can wrap the buffer without a defensive copy
+    rgb_image.flags.writeable = False
+    
+    return rgb_image, {
+        'imageSize': {'width': image_width, 'height': image_height},
+        'processedSize': {'width': processed_width, 'height': processed_height}
+    }
 
-@app.route('/model-info', methods=['GET'])
-def model_info():
-    """Get information about the loaded model."""
-    return jsonify({
-        'modelLoaded': hands_model is not None,
-        'modelType': 'MediaPipe Hands',
-        'version': mp.__version__,
-        'description': 'MediaPipe Hands for real-time hand landmark detection',
-        'maxHands': 2,
-        'landmarks': 21,
-        'inputFormat': 'base64-encoded image (data:image/...)',
-        'maxImageSize': '50MB',
-        'detectionConfidence': 0.7,
-        'trackingConfidence': 0.5
-    })
+def run_gesture_detection(image_bytes: bytes, session_id: Optional[str] = None,
+                          landmark_format: str = 'aos'):
+    """
+    Run the /detect-gesture pipeline on encoded image bytes.
+    
+    Args:
+        image_bytes: Encoded image (JPEG, PNG, ...)
+        session_id: Optional streaming session for tracking-mode detection
+        landmark_format: Landmark layout of the response, see process_hand_landmarks
+        
+    Returns:
+        Flask response (with status code on errors)
+    """
+    # Identical images (retries, duplicate frames) skip decoding and inference. Session
+    # frames are never cached: the tracking graph must see every frame to keep its state
+    cache_key = None if session_id else image_cache_key(image_bytes, landmark_format)
+    body_prefix = get_cached_response(cache_key)
+    if body_prefix is not None:
+        return timestamped_response(body_prefix)
+    
+    decoded = decode_for_inference(image_bytes)
+    if decoded is None:
+        return jsonify({
+            'error': 'Image decoding failed',
+            'message': 'Unable to decode the provided image. Please ensure it\'s a valid image format.'
+        }), 400
+    rgb_image, image_sizes = decoded
+    
+    # Run hand detection
+    try:
+        logger.debug("Running MediaPipe hand detection...")
+        results = detect_hands(rgb_image, session_id)
+        logger.debug("Detection complete. Found %d hand(s)", len(results.multi_hand_landmarks or ()))
+    except Exception as e:
+        logger.error(f"MediaPipe detection error: {e}")
+        return jsonify({
+            'error': 'Detection failed',
+            'message': 'An error occurred during hand detection processing.'
+        }), 500
+    
+    # Process results
+    if not results.multi_hand_landmarks:
+        body_prefix = NO_HANDS_BODY_PREFIX
+    else:
+        # Only the per-request parts go through the encoder; the constants are spliced in
+        processed_hands = process_hand_landmarks(results, landmark_format)
+        body_prefix = b''.join((
+            DETECTION_BODY_HEAD, str(len(processed_hands)).encode(),
+            DETECTION_BODY_PREDICTIONS, app.json.dumps(processed_hands).encode(),
+            DETECTION_BODY_PROCESSING_INFO, app.json.dumps(image_sizes)[1:].encode(),
+            DETECTION_BODY_TIMESTAMP
+        ))
+    cache_response(cache_key, body_prefix)
+    
+    return timestamped_response(body_prefix)
 
 @app.route('/detect-gesture', methods=['POST'])
 def detect_gesture():
     """
     Main gesture detection endpoint.
-    Accepts base64-encoded images and returns hand landmarks.
+    Accepts base64-encoded images (JSON) or image file uploads (multipart/form-data)
+    and returns hand landmarks.
     """
     try:
         # Check if model is loaded
@@ -394,46 +1996,169 @@ def detect_gesture():
             }), 503
         
         # Validate request
-        if not request.is_json:
+        if not request.is_json and request.mimetype != 'multipart/form-data':
             return jsonify({
                 'error': 'Invalid content type',
-                'message': 'Request must be JSON with application/json content type.'
+                'message': 'Request must be JSON (application/json) or multipart/form-data.'
             }), 400
         
-        data = request.get_json()
+        # Parse without caching so the raw body and its image field can be freed early
+        data = read_request_fields()
         if not data or 'image' not in data:
             return jsonify({
                 'error': 'Missing image data',
                 'message': 'Please provide a base64-encoded image in the request body.'
             }), 400
         
-        base64_image = data['image']
+        base64_image = data.pop('image')
+        session_id = data.get('session_id')
+        del data
         
         # Validate base64 format
-        if not isinstance(base64_image, str):
+        if not isinstance(base64_image, (str, bytes)):
             return jsonify({
                 'error': 'Invalid image format',
-                'message': 'Image must be a base64-encoded string.'
+                'message': 'Image must be a base64-encoded string or an uploaded file.'
+            }), 400
+        
+        if session_id is not None and not isinstance(session_id, str):
+            return jsonify({
+                'error': 'Invalid session id',
+                'message': 'session_id must be a string.'
             }), 400
         
-        logger.info("Processing gesture detection request...")
+        landmark_format = request.args.get('format', 'aos')
+        if landmark_format not in LANDMARK_FORMATS:
+            return jsonify({
+                'error': 'Invalid format',
+                'message': f'format must be one of: {", ".join(LANDMARK_FORMATS)}.'
+            }), 400
         
-        # Decode base64 image
-        image = decode_base64_image(base64_image)
-        if image is None:
+        logger.debug("Processing gesture detection request...")
+        
+        # Decode the image field, then drop the (potentially huge) string right away
+        image_bytes = decode_image_field(base64_image)
+        del base64_image
+        if image_bytes is None:
             return jsonify({
                 'error': 'Image decoding failed',
                 'message': 'Unable to decode the provided base64 image. Please ensure it\'s a valid image format.'
             }), 400
         
-        # Convert BGR to RGB for MediaPipe
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return run_gesture_detection(image_bytes, session_id, landmark_format)
+        
+    except Exception as e:
+        logger.error(f"Unexpected error in detect_gesture: {e}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred while processing the request.',
+            'timestamp': now_iso()
+        }), 500
+
+@app.route('/detect-gesture-raw', methods=['POST'])
+def detect_gesture_raw():
+    """
+    Gesture detection on a raw image body (Content-Type: image/jpeg, image/png, ...).
+    Skips JSON parsing and base64 decoding; session_id may be passed as a query parameter.
+    """
+    try:
+        # Check if model is loaded
+        if hands_model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'MediaPipe Hands model is not initialized. Please try again later.'
+            }), 503
+        
+        # Validate request
+        if not request.mimetype.startswith('image/'):
+            return jsonify({
+                'error': 'Invalid content type',
+                'message': 'Request body must be an image with an image/* content type.'
+            }), 400
+        
+        landmark_format = request.args.get('format', 'aos')
+        if landmark_format not in LANDMARK_FORMATS:
+            return jsonify({
+                'error': 'Invalid format',
+                'message': f'format must be one of: {", ".join(LANDMARK_FORMATS)}.'
+            }), 400
+        
+        image_bytes = request.get_data(cache=False)
+        if not image_bytes:
+            return jsonify({
+                'error': 'Missing image data',
+                'message': 'Please provide the image bytes in the request body.'
+            }), 400
+        
+        logger.debug("Processing raw gesture detection request...")
+        return run_gesture_detection(image_bytes, request.args.get('session_id'), landmark_format)
+        
+    except Exception as e:
+        logger.error(f"Unexpected error in detect_gesture_raw: {e}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred while processing the request.',
+            'timestamp': now_iso()
+        }), 500
+
+@app.route('/detect-gesture-bin', methods=['POST'])
+def detect_gesture_bin():
+    """
+    Gesture detection with a compact msgpack response.
+    Accepts a raw image body (image/*), JSON {"image": base64} or a multipart upload; landmark coordinates are
+    returned as little-endian int16 fixed-point bytes (value * BINARY_COORD_SCALE).
+    """
+    try:
+        # Check if model is loaded
+        if hands_model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'MediaPipe Hands model is not initialized. Please try again later.'
+            }), 503
+        
+        if msgpack is None:
+            return jsonify({
+                'error': 'Binary format unavailable',
+                'message': 'The msgpack package is not installed on the server.'
+            }), 501
+        
+        # Accept either raw image bytes or the usual JSON body
+        session_id = request.args.get('session_id')
+        if request.mimetype.startswith('image/'):
+            image_bytes = request.get_data(cache=False)
+        elif request.is_json or request.mimetype == 'multipart/form-data':
+            data = read_request_fields()
+            if not data or not isinstance(data.get('image'), (str, bytes)):
+                return jsonify({
+                    'error': 'Missing image data',
+                    'message': 'Please provide a base64-encoded image or an image file in the request body.'
+                }), 400
+            session_id = data.get('session_id', session_id)
+            image_bytes = decode_image_field(data.pop('image'))
+            del data
+        else:
+            return jsonify({
+                'error': 'Invalid content type',
+                'message': 'Request must be an image/* body, JSON (application/json) or multipart/form-data.'
+            }), 400
+        
+        if session_id is not None and not isinstance(session_id, str):
+            return jsonify({
+                'error': 'Invalid session id',
+                'message': 'session_id must be a string.'
+            }), 400
+        
+        decoded = decode_for_inference(image_bytes) if image_bytes else None
+        if decoded is None:
+            return jsonify({
+                'error': 'Image decoding failed',
+                'message': 'Unable to decode the provided image. Please ensure it\'s a valid image format.'
+            }), 400
+        rgb_image, image_sizes = decoded
         
         # Run hand detection
         try:
-            logger.info("Running MediaPipe hand detection...")
-            results = hands_model.process(rgb_image)
-            logger.info(f"✅ Detection complete. Found {len(results.multi_hand_landmarks) if results.multi_hand_landmarks else 0} hand(s)")
+            results = detect_hands(rgb_image, session_id)
         except Exception as e:
             logger.error(f"MediaPipe detection error: {e}")
             return jsonify({
@@ -441,49 +2166,44 @@ def detect_gesture():
                 'message': 'An error occurred during hand detection processing.'
             }), 500
         
-        # Process results
-        if not results.multi_hand_landmarks:
-            return jsonify({
-                'success': True,
-                'handsDetected': 0,
-                'message': 'No hands detected in the image',
-                'predictions': [],
-                'timestamp': datetime.now().isoformat()
-            })
+        if results.multi_hand_landmarks:
+            coords = extract_landmark_array(results)[:, :, :3]
+            handedness = [hand.classification[0].label.lower() for hand in results.multi_handedness]
+            confidence = [round(hand.classification[0].score, 4) for hand in results.multi_handedness]
+        else:
+            coords = np.zeros((0, len(LANDMARK_NAMES), 3))
+            handedness = []
+            confidence = []
         
-        # Format response
-        processed_hands = process_hand_landmarks(results)
+        # Fixed-point int16: 2 bytes per coordinate instead of ~10 bytes of JSON text
+        quantized = np.clip(np.rint(coords * BINARY_COORD_SCALE), -32768, 32767).astype('<i2')
         
-        response_data = {
+        body = msgpack.packb({
             'success': True,
-            'handsDetected': len(processed_hands),
-            'predictions': processed_hands,
-            'timestamp': datetime.now().isoformat(),
-            'processingInfo': {
-                'modelType': 'MediaPipe Hands',
-                'modelVersion': mp.__version__,
-                'imageSize': {
-                    'width': image.shape[1],
-                    'height': image.shape[0]
-                }
-            }
-        }
-        
-        return jsonify(response_data)
+            'handsDetected': len(handedness),
+            'coords': quantized.tobytes(),
+            'shape': list(quantized.shape),
+            'scale': BINARY_COORD_SCALE,
+            'handedness': handedness,
+            'confidence': confidence,
+            'processingInfo': image_sizes,
+            'timestamp': now_iso()
+        }, use_bin_type=True)
+        return app.response_class(body, mimetype='application/msgpack')
         
     except Exception as e:
-        logger.error(f"Unexpected error in detect_gesture: {e}")
+        logger.error(f"Unexpected error in detect_gesture_bin: {e}")
         return jsonify({
             'error': 'Internal server error',
             'message': 'An unexpected error occurred while processing the request.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
 @app.route('/record-gesture', methods=['POST'])
 def record_gesture():
     """
     Record a gesture by extracting landmarks and saving to CSV.
-    Accepts gesture_name and base64 image.
+    Accepts gesture_name and a base64 image (JSON) or image file (multipart/form-data).
     """
     try:
         # Check if model is loaded
@@ -494,13 +2214,13 @@ def record_gesture():
             }), 503
         
         # Validate request
-        if not request.is_json:
+        if not request.is_json and request.mimetype != 'multipart/form-data':
             return jsonify({
                 'error': 'Invalid content type',
-                'message': 'Request must be JSON with application/json content type.'
+                'message': 'Request must be JSON (application/json) or multipart/form-data.'
             }), 400
         
-        data = request.get_json()
+        data = read_request_fields()
         if not data or 'gesture_name' not in data or 'image' not in data:
             return jsonify({
                 'error': 'Missing required data',
@@ -517,30 +2237,29 @@ def record_gesture():
                 'message': 'Gesture name must be a non-empty string.'
             }), 400
         
-        if not isinstance(base64_image, str):
+        if not isinstance(base64_image, (str, bytes)):
             return jsonify({
                 'error': 'Invalid image format',
-                'message': 'Image must be a base64-encoded string.'
+                'message': 'Image must be a base64-encoded string or an uploaded file.'
             }), 400
         
         gesture_name = gesture_name.strip()
         logger.info(f"Recording gesture: {gesture_name}")
         
-        # Decode base64 image
-        image = decode_base64_image(base64_image)
-        if image is None:
+        # Decode straight to RGB, downscaled to MAX_INFERENCE_DIMENSION for MediaPipe
+        image_bytes = decode_image_field(base64_image)
+        decoded = decode_for_inference(image_bytes) if image_bytes else None
+        if decoded is None:
             return jsonify({
                 'error': 'Image decoding failed',
                 'message': 'Unable to decode the provided base64 image. Please ensure it\'s a valid image format.'
             }), 400
-        
-        # Convert BGR to RGB for MediaPipe
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        rgb_image = decoded[0]
         
         # Run hand detection
         try:
             logger.info("Running MediaPipe hand detection for recording...")
-            results = hands_model.process(rgb_image)
+            results = detect_hands(rgb_image)
             logger.info(f"Detection complete. Found {len(results.multi_hand_landmarks) if results.multi_hand_landmarks else 0} hand(s)")
         except Exception as e:
             logger.error(f"MediaPipe detection error: {e}")
@@ -555,37 +2274,38 @@ def record_gesture():
                 'success': False,
                 'message': 'No hands detected in the image. Please ensure your hand is clearly visible.',
                 'gesture_name': gesture_name,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }), 400
         
-        # Process landmarks
-        processed_hands = process_hand_landmarks(results)
+        # Save the first hand's coordinates; float64 keeps the CSV values at 4 decimals
+        hands_detected = len(results.multi_hand_landmarks)
+        hand_landmarks = landmark_features(results, dtype=np.float64)[0]
         
         # Save to CSV
-        if save_landmarks_to_csv(gesture_name, processed_hands):
+        if save_landmarks_to_csv(gesture_name, hand_landmarks):
             # Get updated dataset info
             dataset_info = {}
-            if os.path.exists(CSV_FILE_PATH):
-                df = pd.read_csv(CSV_FILE_PATH)
+            gesture_counts = get_dataset_counts()
+            if gesture_counts is not None:
                 dataset_info = {
-                    'totalSamples': len(df),
-                    'gestures': df['gesture_name'].value_counts().to_dict()
+                    'totalSamples': sum(gesture_counts.values()),
+                    'gestures': dict(gesture_counts.most_common())
                 }
             
             return jsonify({
                 'success': True,
                 'message': f'Gesture "{gesture_name}" recorded successfully',
                 'gesture_name': gesture_name,
-                'handsDetected': len(processed_hands),
+                'handsDetected': hands_detected,
                 'landmarksSaved': True,
                 'dataset': dataset_info,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             })
         else:
             return jsonify({
                 'error': 'Failed to save data',
                 'message': 'Could not save landmark data to CSV file.',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }), 500
         
     except Exception as e:
@@ -593,7 +2313,7 @@ def record_gesture():
         return jsonify({
             'error': 'Internal server error',
             'message': 'An unexpected error occurred while recording the gesture.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
 @app.route('/train', methods=['POST'])
@@ -614,14 +2334,14 @@ def train_model():
             logger.info("✅ Model training completed successfully")
             return jsonify({
                 **result,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso(),
                 'modelPath': MODEL_FILE_PATH
             })
         else:
             logger.warning(f"Training failed: {result['message']}")
             return jsonify({
                 **result,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }), 400
         
     except Exception as e:
@@ -629,14 +2349,88 @@ def train_model():
         return jsonify({
             'error': 'Internal server error',
             'message': 'An unexpected error occurred during model training.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
+        }), 500
+
+def decode_batch_frame(image: Any) -> Optional[np.ndarray]:
+    """
+    Decode one frame of a multi-image request on a decode_pool thread.
+    
+    Args:
+        image: Base64 string or uploaded file bytes
+        
+    Returns:
+        Read-only RGB frame that owns its memory, or None if decoding fails
+    """
+    image_bytes = decode_image_field(image) if isinstance(image, (str, bytes)) else None
+    decoded = decode_for_inference(image_bytes) if image_bytes else None
+    if decoded is None:
+        return None
+    
+    # This thread's scratch buffers are reused by its next frame, so hand back a private copy
+    rgb_image = decoded[0]
+    if not rgb_image.flags.owndata:
+        rgb_image = rgb_image.copy()
+        rgb_image.flags.writeable = False
+    return rgb_image
+
+def detect_trained_gesture_batch(model: Any, images: Any, session_id: Optional[str] = None):
+    """
+    Classify several frames sent in one /detect request.
+    
+    Args:
+        model: Trained gesture classifier
+        images: The request's 'images' field, a list of base64 strings or uploaded files
+        session_id: Optional streaming session; frames are tracked in list order
+        
+    Returns:
+        Flask response with one /detect result per frame, in input order
+    """
+    if not isinstance(images, list) or not images:
+        return jsonify({
+            'error': 'Invalid image format',
+            'message': 'images must be a non-empty list of base64-encoded strings or uploaded files.'
+        }), 400
+    
+    if len(images) > MAX_DETECT_BATCH_IMAGES:
+        return jsonify({
+            'error': 'Too many images',
+            'message': f'At most {MAX_DETECT_BATCH_IMAGES} images can be sent in one request.'
+        }), 400
+    
+    logger.debug("Processing %d frames with trained model...", len(images))
+    
+    rgb_images = list(decode_pool.map(decode_batch_frame, images))
+    for index, rgb_image in enumerate(rgb_images):
+        if rgb_image is None:
+            return jsonify({
+                'error': 'Image decoding failed',
+                'message': f'Unable to decode image {index}. Please ensure it\'s a valid image format.'
+            }), 400
+    
+    try:
+        predictions = batch_predict(model, rgb_images, session_id)
+    except Exception as e:
+        logger.error(f"Detection error: {e}")
+        return jsonify({
+            'error': 'Detection failed',
+            'message': 'An error occurred during hand detection processing.'
         }), 500
+    
+    return jsonify({
+        'success': True,
+        'count': len(predictions),
+        'results': predictions,
+        'timestamp': now_iso()
+    })
 
 @app.route('/detect', methods=['POST'])
 def detect_trained_gesture():
     """
     Detect gesture using the trained model.
-    Accepts base64 image and returns predicted gesture name.
+    Accepts a base64 image (JSON), image file (multipart/form-data) or raw image/* body
+    and returns the predicted gesture name; an 'images' list instead returns one result
+    per frame.
     """
     try:
         # Check if MediaPipe model is loaded
@@ -655,145 +2449,104 @@ def detect_trained_gesture():
             }), 404
         
         # Validate request
-        if not request.is_json:
+        if request.mimetype.startswith('image/'):
+            # Raw image body: no JSON parsing or base64; session_id comes from the query string
+            data = {'image': request.get_data(cache=False)}
+            if request.args.get('session_id') is not None:
+                data['session_id'] = request.args['session_id']
+        elif request.is_json or request.mimetype == 'multipart/form-data':
+            data = read_request_fields()
+        else:
             return jsonify({
                 'error': 'Invalid content type',
-                'message': 'Request must be JSON with application/json content type.'
+                'message': 'Request must be JSON (application/json), multipart/form-data or an image/* body.'
             }), 400
         
-        data = request.get_json()
-        if not data or 'image' not in data:
+        if not data or ('image' not in data and 'images' not in data):
             return jsonify({
                 'error': 'Missing image data',
                 'message': 'Please provide a base64-encoded image in the request body.'
             }), 400
         
-        base64_image = data['image']
+        session_id = data.get('session_id')
+        if session_id is not None and not isinstance(session_id, str):
+            return jsonify({
+                'error': 'Invalid session id',
+                'message': 'session_id must be a string.'
+            }), 400
+        
+        if 'images' in data:
+            images = data.pop('images')
+            del data
+            return detect_trained_gesture_batch(model, images, session_id)
+        
+        base64_image = data.pop('image')
+        del data
         
         # Validate base64 format
-        if not isinstance(base64_image, str):
+        if not isinstance(base64_image, (str, bytes)):
             return jsonify({
                 'error': 'Invalid image format',
-                'message': 'Image must be a base64-encoded string.'
+                'message': 'Image must be a base64-encoded string or an uploaded file.'
             }), 400
         
-        logger.info("Processing gesture detection with trained model...")
+        logger.debug("Processing gesture detection with trained model...")
         
-        # Decode base64 image
-        image = decode_base64_image(base64_image)
-        if image is None:
+        # Decode straight to RGB, downscaled to MAX_INFERENCE_DIMENSION for MediaPipe
+        image_bytes = decode_image_field(base64_image)
+        decoded = decode_for_inference(image_bytes) if image_bytes else None
+        if decoded is None:
             return jsonify({
                 'error': 'Image decoding failed',
                 'message': 'Unable to decode the provided base64 image. Please ensure it\'s a valid image format.'
             }), 400
+        rgb_image = decoded[0]
         
-        # Convert BGR to RGB for MediaPipe
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Run hand detection
+        # Run hand detection and classification
         try:
-            logger.info("Running MediaPipe hand detection for prediction...")
-            results = hands_model.process(rgb_image)
-            logger.info(f"Detection complete. Found {len(results.multi_hand_landmarks) if results.multi_hand_landmarks else 0} hand(s)")
+            logger.debug("Running MediaPipe hand detection for prediction...")
+            prediction = batch_predict(model, [rgb_image], session_id)[0]
         except Exception as e:
-            logger.error(f"MediaPipe detection error: {e}")
+            logger.error(f"Detection error: {e}")
             return jsonify({
                 'error': 'Detection failed',
                 'message': 'An error occurred during hand detection processing.'
             }), 500
         
-        # Check if hands were detected
-        if not results.multi_hand_landmarks:
-            return jsonify({
-                'success': False,
-                'message': 'No hands detected in the image. Please ensure your hand is clearly visible.',
-                'predicted_gesture': None,
-                'confidence': 0.0,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # Process landmarks
-        processed_hands = process_hand_landmarks(results)
-        
-        # Extract features for prediction (using first hand)
-        if not processed_hands:
-            return jsonify({
-                'success': False,
-                'message': 'Could not extract hand landmarks.',
-                'predicted_gesture': None,
-                'confidence': 0.0,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        first_hand = processed_hands[0]['landmarks']
-        if len(first_hand) != 21:
-            return jsonify({
-                'success': False,
-                'message': f'Expected 21 landmarks, got {len(first_hand)}.',
-                'predicted_gesture': None,
-                'confidence': 0.0,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # Prepare feature vector
-        features = []
-        for landmark in first_hand:
-            features.extend([landmark['x'], landmark['y'], landmark['z']])
-        
-        # Predict gesture
-        prediction = model.predict([features])[0]
-        prediction_proba = model.predict_proba([features])[0]
-        confidence = max(prediction_proba)
-        
-        # Get class probabilities
-        classes = model.classes_
-        probabilities = dict(zip(classes, prediction_proba))
-        
-        logger.info(f"✅ Predicted gesture: {prediction} (confidence: {confidence:.4f})")
-        
-        return jsonify({
-            'success': True,
-            'predicted_gesture': prediction,
-            'confidence': round(confidence, 4),
-            'all_probabilities': {k: round(v, 4) for k, v in probabilities.items()},
-            'handsDetected': len(processed_hands),
-            'handedness': processed_hands[0]['handedness'],
-            'timestamp': datetime.now().isoformat()
-        })
+        prediction['timestamp'] = now_iso()
+        return jsonify(prediction)
         
     except Exception as e:
         logger.error(f"Unexpected error in detect_trained_gesture: {e}")
         return jsonify({
             'error': 'Internal server error',
             'message': 'An unexpected error occurred during gesture detection.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
 @app.route('/dataset-info', methods=['GET'])
 def dataset_info():
     """Get information about the recorded dataset."""
     try:
-        if not os.path.exists(CSV_FILE_PATH):
+        gesture_counts = get_dataset_counts()
+        if gesture_counts is None:
             return jsonify({
                 'exists': False,
                 'message': 'No dataset found. Start recording gestures first.',
                 'totalSamples': 0,
                 'gestures': {},
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             })
         
-        df = pd.read_csv(CSV_FILE_PATH)
-        gesture_counts = df['gesture_name'].value_counts()
-        
         return jsonify({
             'exists': True,
-            'totalSamples': len(df),
+            'totalSamples': sum(gesture_counts.values()),
             'gestureCount': len(gesture_counts),
-            'gestures': gesture_counts.to_dict(),
+            'gestures': dict(gesture_counts.most_common()),
             'filePath': CSV_FILE_PATH,
             'modelExists': os.path.exists(MODEL_FILE_PATH),
             'modelPath': MODEL_FILE_PATH if os.path.exists(MODEL_FILE_PATH) else None,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         })
         
     except Exception as e:
@@ -801,80 +2554,215 @@ def dataset_info():
         return jsonify({
             'error': 'Internal server error',
             'message': 'Could not retrieve dataset information.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
+def build_error_body_prefix(fields: Dict[str, Any]) -> bytes:
+    """Serialize a constant error body once, leaving it open for timestamped_response()."""
+    return app.json.dumps(fields)[:-1].encode() + DETECTION_BODY_TIMESTAMP
+
+FILE_TOO_LARGE_BODY_PREFIX = build_error_body_prefix({
+    'error': 'File too large',
+    'message': 'The uploaded image is too large. Maximum size is 50MB.'
+})
+# "METHOD /path" of every route registered above, for the 404 body and the startup banner
+AVAILABLE_ENDPOINTS = tuple(sorted(
+    f"{','.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))} {rule.rule}"
+    for rule in app.url_map.iter_rules()
+    if rule.endpoint != 'static'
+))
+
+NOT_FOUND_BODY_PREFIX = build_error_body_prefix({
+    'error': 'Not found',
+    'message': 'The requested endpoint was not found.',
+    'availableEndpoints': AVAILABLE_ENDPOINTS
+})
+INTERNAL_ERROR_BODY_PREFIX = build_error_body_prefix({
+    'error': 'Internal server error',
+    'message': 'An unexpected error occurred on the server.'
+})
+
 @app.errorhandler(413)
 def file_too_large(error):
     """Handle file too large errors."""
-    return jsonify({
-        'error': 'File too large',
-        'message': 'The uploaded image is too large. Maximum size is 50MB.',
-        'timestamp': datetime.now().isoformat()
-    }), 413
+    return timestamped_response(FILE_TOO_LARGE_BODY_PREFIX, 413)
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({
-        'error': 'Not found',
-        'message': 'The requested endpoint was not found.',
-        'availableEndpoints': [
-            'GET /health',
-            'GET /model-info',
-            'GET /dataset-info',
-            'POST /detect-gesture',
-            'POST /record-gesture',
-            'POST /train',
-            'POST /detect'
-        ],
-        'timestamp': datetime.now().isoformat()
-    }), 404
+    return timestamped_response(NOT_FOUND_BODY_PREFIX, 404)
 
 @app.errorhandler(500)
 def internal_server_error(error):
     """Handle 500 errors."""
     logger.error(f"Internal server error: {error}")
-    return jsonify({
-        'error': 'Internal server error',
-        'message': 'An unexpected error occurred on the server.',
-        'timestamp': datetime.now().isoformat()
-    }), 500
+    return timestamped_response(INTERNAL_ERROR_BODY_PREFIX, 500)
 
-def main():
-    """Main function to start the Flask server."""
-    print("🚀 ======================================")
-    print("🚀 Hand Gesture Recognition API Server")
-    print("🚀 Backend: Flask + MediaPipe")
-    print("🚀 ======================================")
+def initialize_worker() -> bool:
+    """
+    Initialize and warm up per-process server state (MediaPipe models, classifier).
+    Called by main() for the dev server and by gunicorn's post_fork hook for each worker.
+    """
+    global hands_model, inference_process
+    
+    if INFERENCE_PROCESS:
+        # The child process owns MediaPipe; hands_model only marks the server as ready
+        logger.info("Starting MediaPipe inference process...")
+        inference_process = InferenceProcess()
+        if not inference_process.wait_ready(timeout=120):
+            logger.error("Failed to start the MediaPipe inference process.")
+            inference_process = None
+            return False
+        hands_model = inference_process
+        logger.info(f"MediaPipe inference process ready (pid {inference_process.process.pid})")
+    elif not initialize_mediapipe_model():
+        logger.error("Failed to initialize MediaPipe model.")
+        return False
+    
+    # Compile (or load the cached) normalization kernel now instead of on the first request
+    normalize_landmark_rows(np.zeros((1, 63), dtype=np.float32))
+    
+    # Load the trained classifier and predict once, so the first /detect is not a cold start
+    model = load_model()
+    if model is not None:
+        predict_proba_batch([(model, np.zeros(63, dtype=np.float32))])
+    
+    # The dataset CSV is created by the first /record-gesture write (see get_csv_writer),
+    # so a slow filesystem does not hold up startup
+    return True
+
+def run_gunicorn() -> Optional[int]:
+    """
+    Serve the app with gunicorn workers in this process, configured by gunicorn.conf.py.
+    
+    Returns:
+        Exit code, or None if gunicorn is not installed (e.g. on Windows)
+    """
+    try:
+        from gunicorn.app.base import Application
+    except ImportError:
+        return None
+    
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    
+    class GestureAPIServer(Application):
+        """Gunicorn application serving this module's Flask app."""
+        
+        def load_config(self):
+            # Settings come from gunicorn.conf.py and its environment variables, not argv
+            self.load_config_from_file(config_path)
+        
+        def load(self):
+            return app
+    
+    print("🚀 Mode: production (gunicorn, see gunicorn.conf.py)")
+    sys.stdout.flush()
+    GestureAPIServer().run()
+    return 0
+
+def run_single_process_server(server: str, host: str, port: int) -> Optional[int]:
+    """
+    Serve the app from this process with waitress or bjoern, for hosts without gunicorn
+    (waitress runs on Windows) or where a single process is wanted.
+    
+    Args:
+        server: 'waitress' or 'bjoern'
+        host: Interface to bind
+        port: Port to bind
+        
+    Returns:
+        Exit code, or None if the server package is not installed
+    """
+    try:
+        if server == 'waitress':
+            from waitress import serve
+        else:
+            import bjoern
+    except ImportError:
+        return None
     
-    # Initialize MediaPipe model
-    if not initialize_mediapipe_model():
+    if not initialize_worker():
         logger.error("Failed to initialize MediaPipe model. Exiting...")
         return 1
     
-    # Initialize CSV file for data storage
-    initialize_csv_file()
+    print(f"🚀 Mode: production ({server}) on http://{host}:{port}")
+    sys.stdout.flush()
+    if server == 'waitress':
+        # Threads overlap requests while MediaPipe runs with the GIL released
+        serve(app, host=host, port=port, threads=int(os.environ.get('WAITRESS_THREADS', 8)))
+    else:
+        # bjoern is single-threaded; concurrent requests wait for each other
+        bjoern.run(app, host, port)
+    return 0
+
+def main():
+    """Main function to start the Flask server."""
+    sys.stdout.write(
+        "🚀 ======================================\n"
+        "🚀 Hand Gesture Recognition API Server\n"
+        "🚀 Backend: Flask + MediaPipe\n"
+        "🚀 ======================================\n"
+    )
+    sys.stdout.flush()
     
     # Get configuration
-    host = os.environ.get('HOST', '127.0.0.1')
-    port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
-    
-    print(f"🚀 Host: {host}")
-    print(f"🚀 Port: {port}")
-    print(f"🚀 Debug: {debug}")
-    print(f"🚀 Health Check: http://{host}:{port}/health")
-    print(f"🚀 Model Info: http://{host}:{port}/model-info")
-    print(f"🚀 Dataset Info: http://{host}:{port}/dataset-info")
-    print(f"🚀 Record Gesture: POST http://{host}:{port}/record-gesture")
-    print(f"🚀 Train Model: POST http://{host}:{port}/train")
-    print(f"🚀 Detect Gesture: POST http://{host}:{port}/detect")
-    print(f"🚀 Legacy Detection: POST http://{host}:{port}/detect-gesture")
-    print("🚀 ======================================")
+    config = {key: os.environ.get(key, default) for key, default in (
+        ('HOST', '127.0.0.1'),
+        ('PORT', '5000'),
+        ('FLASK_DEBUG', 'False'),
+        ('FLASK_RUN_MODE', None),
+        ('SERVER', None)
+    )}
+    host = config['HOST']
+    port = int(config['PORT'])
+    debug = config['FLASK_DEBUG'].lower() == 'true'
+    
+    # SERVER=gunicorn|waitress|bjoern|dev; FLASK_RUN_MODE=prod|dev is the older spelling.
+    # Production servers are used unless debugging, falling back to the Flask development
+    # server when none is installed
+    run_mode = config['FLASK_RUN_MODE'] or ('dev' if debug else 'prod')
+    server = (config['SERVER'] or ('gunicorn' if run_mode == 'prod' else 'dev')).lower()
+    if server not in ('gunicorn', 'waitress', 'bjoern', 'dev'):
+        logger.error(f"Unknown SERVER '{server}'; expected gunicorn, waitress, bjoern or dev")
+        return 1
+    
+    # Every server binds HOST/PORT (gunicorn.conf.py included), so list the endpoints up front
+    base_url = f"http://{host}:{port}"
+    sys.stdout.write("\n".join((
+        f"🚀 Host: {host}",
+        f"🚀 Port: {port}",
+        f"🚀 Debug: {debug}",
+        *(f"🚀 {method} {base_url}{path}"
+          for method, path in (endpoint.split(' ', 1) for endpoint in AVAILABLE_ENDPOINTS)),
+        "🚀 ======================================\n"
+    )))
+    sys.stdout.flush()
+    
+    # gunicorn workers initialize themselves after fork
+    if server == 'gunicorn':
+        exit_code = run_gunicorn()
+        if exit_code is not None:
+            return exit_code
+        logger.warning("gunicorn is not installed (or not supported here); trying waitress")
+        server = 'waitress'
+    
+    if server in ('waitress', 'bjoern'):
+        exit_code = run_single_process_server(server, host, port)
+        if exit_code is not None:
+            return exit_code
+        logger.warning(f"{server} is not installed; falling back to the Flask development server")
+    
+    # With debug on, this process only runs the reloader, which restarts a child process
+    # (WERKZEUG_RUN_MAIN=true) to serve; MediaPipe is only needed in that child
+    reloader_parent = debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+    if not reloader_parent and not initialize_worker():
+        logger.error("Failed to initialize MediaPipe model. Exiting...")
+        return 1
     
     try:
-        app.run(host=host, port=port, debug=debug)
+        # watchdog's file events notice edits sooner and cheaper than polling every file's mtime
+        reloader_type = 'watchdog' if importlib.util.find_spec('watchdog') else 'stat'
+        app.run(host=host, port=port, debug=debug, reloader_type=reloader_type)
     except KeyboardInterrupt:
         logger.info("Server shutdown requested by user")
     except Exception as e:
@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the Hand Gesture Recognition API.
+
+Usage (from the backend directory):
+    gunicorn -c gunicorn.conf.py app:app
+
+or simply `python app.py`, which starts the same configuration in-process
+(set FLASK_DEBUG=true or SERVER=dev for the Flask development server).
+"""
+
+import importlib
+import multiprocessing
+import os
+
+# Bind to the same HOST/PORT variables as the development server
+bind = f"{os.environ.get('HOST', '127.0.0.1')}:{os.environ.get('PORT', 5000)}"
+
+# One process per core; threads overlap requests while MediaPipe's C++ code
+# runs with the GIL released. Inference is CPU-bound, so more processes than cores
+# (the usual 2 * cores + 1) would only add MediaPipe graphs competing for the same cores
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+
+# gthread by default: the MediaPipe/classifier batchers rely on real OS threads, which
+# gevent's monkey-patching would turn into greenlets blocked behind C calls
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))  # async workers only
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+
+# Keep webcam clients' connections open between frames
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Import app.py (Flask, OpenCV, MediaPipe, scikit-learn) once in the master so
+# workers share those pages copy-on-write. Everything app.py imports at module level is
+# therefore forked: native runtimes that start thread pools when imported (onnxruntime,
+# for one) must be imported lazily inside the workers instead, or every worker aborts or
+# hangs when it exits
+preload_app = True
+
+# Opt in to SO_REUSEPORT only when deliberately running several masters on one port;
+# otherwise a stale server would silently share the port instead of "address in use"
+reuse_port = os.environ.get('GUNICORN_REUSE_PORT', '0').lower() in ('1', 'true', 'yes')
+
+
+def post_fork(server, worker):
+    """
+    Build and warm up the MediaPipe graphs (and any lazily imported native runtime, such
+    as onnxruntime for CLASSIFIER_RUNTIME=onnx) inside each worker. They are not fork-safe
+    (their threads, and any GPU context, do not survive fork()), so unlike the imported
+    libraries they cannot be created once in the preloaded master.
+    """
+    flask_app = server.app.wsgi()
+    app_module = importlib.import_module(flask_app.import_name)
+    if not app_module.initialize_worker():
+        raise RuntimeError("Worker initialization failed")
@@ -17,6 +17,9 @@ const CameraFeed: React.FC<CameraFeedProps> = ({ onGestureDetected, useMLModel =
   const [error, setError] = useState<string>('');
   const [key, setKey] = useState<number>(0);
   const detectionIntervalRef = useRef<NodeJS.Timeout | null>(null);
+  // Identifies this camera's frame stream, so the backend tracks the hand between frames
+  // instead of re-running palm detection on every one
+  const sessionIdRef = useRef<string>(`camera-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`);
   
   // Check backend health on component mount
   useEffect(() => {
@@ -95,7 +98,7 @@ const CameraFeed: React.FC<CameraFeedProps> = ({ onGestureDetected, useMLModel =
       if (useMLModel) {
         try {
           // Use trained ML model for detection
-          const mlResponse = await api.detectTrainedGesture(imageSrc);
+          const mlResponse = await api.detectTrainedGesture(imageSrc, sessionIdRef.current);
           setLastDetection({
             success: mlResponse.success,
             handsDetected: mlResponse.handsDetected,
@@ -117,7 +120,7 @@ const CameraFeed: React.FC<CameraFeedProps> = ({ onGestureDetected, useMLModel =
         } catch (mlError) {
           console.warn('ML detection failed, falling back to landmark analysis:', mlError);
           // Fall back to landmark analysis
-          const response = await api.detectGesture(imageSrc);
+          const response = await api.detectGesture(imageSrc, sessionIdRef.current);
           
           if (response.success && response.handsDetected > 0) {
             gesture = analyzeGestureFromLandmarks(response.predictions[0]);
@@ -129,7 +132,7 @@ const CameraFeed: React.FC<CameraFeedProps> = ({ onGestureDetected, useMLModel =
         }
       } else {
         // Use MediaPipe landmark detection and analysis
-        const response = await api.detectGesture(imageSrc);
+        const response = await api.detectGesture(imageSrc, sessionIdRef.current);
         
         // Process detected gestures using landmark analysis
         if (response.success && response.handsDetected > 0) {
@@ -36,6 +36,19 @@ export interface GestureHand {
   gesture?: string; // Optional gesture property for ML model results
 }
 
+// Column (structure-of-arrays) layout returned by /detect-gesture?format=soa
+export interface GestureHandColumns {
+  handIndex: number;
+  handedness: string;
+  confidence: number;
+  names: string[];
+  x: number[];
+  y: number[];
+  z: number[];
+  visibility: number[];
+  totalLandmarks: number;
+}
+
 export interface GestureDetectionResponse {
   success: boolean;
   handsDetected: number;
@@ -48,6 +61,10 @@ export interface GestureDetectionResponse {
       width: number;
       height: number;
     };
+    processedSize?: {
+      width: number;
+      height: number;
+    };
   };
 }
 
@@ -81,6 +98,8 @@ export interface TrainModelResponse {
   testingSamples?: number;
   timestamp: string;
   modelPath?: string;
+  runtime?: 'sklearn' | 'onnx';
+  runtimeAccuracy?: number;
 }
 
 export interface DetectTrainedGestureResponse {
@@ -94,6 +113,13 @@ export interface DetectTrainedGestureResponse {
   timestamp: string;
 }
 
+export interface DetectTrainedGestureBatchResponse {
+  success: boolean;
+  count: number;
+  results: Omit<DetectTrainedGestureResponse, 'timestamp'>[];
+  timestamp: string;
+}
+
 export interface DatasetInfoResponse {
   exists: boolean;
   totalSamples: number;
@@ -123,6 +149,30 @@ export interface GestureDetectionRequest {
   image: string; // base64 encoded image
 }
 
+// Decode a webcam data URL (or bare base64 string) into a Blob so it can be uploaded as raw bytes
+const dataUrlToBlob = (dataUrl: string): Blob => {
+  const commaIndex = dataUrl.indexOf(',');
+  const mimeType = dataUrl.slice(0, Math.max(commaIndex, 0)).match(/^data:([^;,]+)/)?.[1] || 'image/jpeg';
+  const binary = atob(dataUrl.slice(commaIndex + 1));
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return new Blob([bytes], { type: mimeType });
+};
+
+// Build a multipart body: the backend reads the image part directly, skipping base64 decoding
+const buildImageForm = (imageData: string | Blob, fields: Record<string, string | undefined> = {}): FormData => {
+  const form = new FormData();
+  form.append('image', typeof imageData === 'string' ? dataUrlToBlob(imageData) : imageData, 'frame');
+  Object.entries(fields).forEach(([key, value]) => {
+    if (value !== undefined) {
+      form.append(key, value);
+    }
+  });
+  return form;
+};
+
 // Mock device state storage to persist changes between calls
 const mockDevices: Device[] = [
   { id: 'light-1', name: 'Living Room Light', type: 'light', isOn: false },
@@ -182,15 +232,10 @@ const api = {
     }
   },
 
-  // Detect gestures from base64 image
-  detectGesture: async (imageData: string): Promise<GestureDetectionResponse> => {
+  // Detect gestures from a webcam screenshot (data URL) or image Blob
+  detectGesture: async (imageData: string | Blob, sessionId?: string): Promise<GestureDetectionResponse> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/detect-gesture`, {
-        image: imageData
-      }, {
-        headers: {
-          'Content-Type': 'application/json',
-        },
+      const response = await axios.post(`${API_BASE_URL}/detect-gesture`, buildImageForm(imageData, { session_id: sessionId }), {
         timeout: 10000, // 10 second timeout
       });
       
@@ -235,15 +280,9 @@ const api = {
   // === NEW ML ENDPOINTS ===
 
   // Record gesture for training
-  recordGesture: async (gestureName: string, imageData: string): Promise<RecordGestureResponse> => {
+  recordGesture: async (gestureName: string, imageData: string | Blob): Promise<RecordGestureResponse> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/record-gesture`, {
-        gesture_name: gestureName,
-        image: imageData
-      }, {
-        headers: {
-          'Content-Type': 'application/json',
-        },
+      const response = await axios.post(`${API_BASE_URL}/record-gesture`, buildImageForm(imageData, { gesture_name: gestureName }), {
         timeout: 15000, // 15 second timeout for processing
       });
       
@@ -272,14 +311,9 @@ const api = {
   },
 
   // Detect gesture using trained ML model
-  detectTrainedGesture: async (imageData: string): Promise<DetectTrainedGestureResponse> => {
+  detectTrainedGesture: async (imageData: string | Blob, sessionId?: string): Promise<DetectTrainedGestureResponse> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/detect`, {
-        image: imageData
-      }, {
-        headers: {
-          'Content-Type': 'application/json',
-        },
+      const response = await axios.post(`${API_BASE_URL}/detect`, buildImageForm(imageData, { session_id: sessionId }), {
         timeout: 10000, // 10 second timeout
       });
       
@@ -290,6 +324,27 @@ const api = {
     }
   },
 
+  // Detect gestures in several buffered frames with one request (at most 32 frames)
+  detectTrainedGestures: async (frames: (string | Blob)[], sessionId?: string): Promise<DetectTrainedGestureBatchResponse> => {
+    try {
+      const form = new FormData();
+      frames.forEach((frame, index) => {
+        form.append('images', typeof frame === 'string' ? dataUrlToBlob(frame) : frame, `frame${index}`);
+      });
+      if (sessionId !== undefined) {
+        form.append('session_id', sessionId);
+      }
+      const response = await axios.post(`${API_BASE_URL}/detect`, form, {
+        timeout: 30000, // 30 second timeout for multiple frames
+      });
+      
+      return response.data;
+    } catch (error) {
+      console.error('Error detecting trained gestures:', error);
+      throw error;
+    }
+  },
+
   // Get dataset information
   getDatasetInfo: async (): Promise<DatasetInfoResponse> => {
     try {